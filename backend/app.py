@@ -1,21 +1,41 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
-from utils.database import init_db
+from utils.database import init_db, init_app as init_database
+from models.ml_model import (
+    start_warm_up, start_model_watcher, model_status, batcher_stats, PREDICTION_CACHE
+)
+from utils.logging_config import configure_logging, init_request_logging, dropped_records
+from utils.metrics import observe_request, render_metrics
+from services.jobs import start_job_runner
+import logging
 import os
+import time
 
 # Import blueprints
 from routes.auth import auth_bp
-from routes. predictions import predictions_bp
+from routes. predictions import predictions_bp, prediction_writer_stats
 from routes. analytics import analytics_bp
 from routes. stations import stations_bp
 from routes.chatbot import chatbot_bp
 from routes.dashboard import dashboard_bp  # ✅ Add this
+from routes.admin import admin_bp
+from routes.jobs import jobs_bp
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# Request ids for log records (registered before the preflight handler so
+# OPTIONS requests get one too)
+init_request_logging(app)
+
+# Pooled database connections, released when each request ends
+init_database(app)
+
 # Initialize JWT
 jwt = JWTManager(app)
 
@@ -38,6 +58,24 @@ app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
 app.register_blueprint(stations_bp, url_prefix='/api/stations')
 app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
 app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')  # ✅ Add this
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+
+# Bring the database schema up to date (versioned migrations)
+if Config.DB_MIGRATE_ON_STARTUP:
+    init_db()
+
+# Load and warm up the models without blocking startup
+if Config.MODEL_WARMUP:
+    start_warm_up()
+
+# Swap in new model files without a restart
+if Config.MODEL_WATCH_INTERVAL > 0:
+    start_model_watcher(Config.MODEL_WATCH_INTERVAL)
+
+# Run queued background jobs and recover ones interrupted by a restart
+if Config.JOB_RUNNER_ENABLED:
+    start_job_runner()
 
 # Add explicit OPTIONS handler
 @app.before_request
@@ -50,10 +88,41 @@ def handle_preflight():
         response.headers.add("Access-Control-Allow-Credentials", "true")
         return response, 200
 
+# Request latency for /api/metrics
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        observe_request(request.endpoint, time.perf_counter() - started)
+    return response
+
 # Health check
 @app.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({"status": "healthy", "message": "RideWise API is running"}), 200
+    return jsonify({
+        "status": "healthy",
+        "message": "RideWise API is running",
+        "models": model_status()
+    }), 200
+
+# Readiness check: 503 until the models are warm
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    status = model_status()
+    if Config.MODEL_WARMUP and not status["ready"]:
+        return jsonify({"status": "warming_up", "models": status}), 503
+    return jsonify({"status": "ready", "models": status}), 200
+
+# Prometheus metrics: per-stage and per-endpoint latency, cache, batcher and writer counters
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    body = render_metrics(PREDICTION_CACHE.stats(), batcher_stats(), dropped_records(),
+                          prediction_writer_stats())
+    return Response(body, mimetype='text/plain; version=0.0.4')
 
 # Test CORS endpoint
 @app.route('/api/test', methods=['GET', 'POST', 'OPTIONS'])
@@ -75,13 +144,9 @@ if __name__ == '__main__':
     os.makedirs('uploads', exist_ok=True)
     os.makedirs('models', exist_ok=True)
 
-    # Initialize database
-    print("🔄 Initializing database...")
-    init_db()
-
     # Run the app
-    print("🚀 Starting RideWise API server...")
-    print(f"✅ CORS enabled for:  {Config.CORS_ORIGINS}")
+    logger.info("Starting RideWise API server")
+    logger.info("CORS enabled for: %s", Config.CORS_ORIGINS)
     app.run(
         debug=Config.DEBUG,
         host='0.0.0.0',
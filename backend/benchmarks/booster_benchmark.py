@@ -0,0 +1,73 @@
+"""
+Compare the pickled sklearn wrapper with the native Booster engine.
+
+    python -m benchmarks.booster_benchmark [--repeat 200] [--nthread 0]
+
+Reports model load time and single-row / 10k-row predict latency for the
+daily and hourly models.
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from config import Config
+from models.engines import BoosterEngine
+from models.export_models import export_native
+from models.ml_model import daily_feature_matrix, hourly_feature_matrix, sample_input_columns
+
+
+def time_call(func, repeat):
+    """Median wall time of func() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def benchmark_model(label, pickle_path, build_matrix, repeat, nthread):
+    with tempfile.TemporaryDirectory() as tmp:
+        native_path = export_native(pickle_path, os.path.join(tmp, 'model.ubj'))
+
+        pickle_ms = time_call(lambda: load_pickle(pickle_path), 5)
+        native_ms = time_call(lambda: BoosterEngine.from_file(native_path), 5)
+
+        sklearn_model = load_pickle(pickle_path)
+        booster_engine = BoosterEngine.from_file(native_path, nthread)
+
+    single = build_matrix(sample_input_columns(1))
+    bulk = build_matrix(sample_input_columns(10_000))
+
+    diff = np.abs(sklearn_model.predict(bulk) - booster_engine.predict(bulk)).max()
+
+    print(f"\n{label} model ({pickle_path})")
+    print(f"  load            pickle {pickle_ms:9.3f} ms   native {native_ms:9.3f} ms")
+    for name, features, reps in (('1 row', single, repeat), ('10k rows', bulk, max(repeat // 20, 5))):
+        sk = time_call(lambda: sklearn_model.predict(features), reps)
+        bo = time_call(lambda: booster_engine.predict(features), reps)
+        print(f"  {name:<15} sklearn {sk:8.3f} ms   booster {bo:8.3f} ms   speedup {sk / bo:5.2f}x")
+    print(f"  max |sklearn - booster| = {diff:.6g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sklearn wrapper vs native Booster latency")
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--nthread', type=int, default=Config.INFERENCE_NTHREAD)
+    args = parser.parse_args()
+
+    benchmark_model('Daily', Config.DAILY_MODEL_PATH, daily_feature_matrix, args.repeat, args.nthread)
+    benchmark_model('Hourly', Config.HOURLY_MODEL_PATH, hourly_feature_matrix, args.repeat, args.nthread)
+
+
+if __name__ == '__main__':
+    main()
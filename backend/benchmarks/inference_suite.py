@@ -0,0 +1,215 @@
+"""
+Reproducible inference benchmark suite.
+
+    python -m benchmarks.inference_suite                       # full run
+    python -m benchmarks.inference_suite --quick               # sizes up to 1k
+    python -m benchmarks.inference_suite --output run.json
+    python -m benchmarks.inference_suite --compare base.json   # diff vs a previous run
+
+Measures, per batch size (1 .. 100k rows):
+  - feature engineering: engineer_daily_features / engineer_hourly_features
+    (one call per row) and the columnar daily/hourly_feature_matrix
+  - raw model call: DAILY_MODEL.predict / HOURLY_MODEL.predict
+  - end to end through the Flask test client: /api/predictions/daily and
+    /hourly (one request per row) and /batch
+
+Every case reports p50/p95/p99 latency in ms and throughput in rows/s.
+Results are written as JSON with the environment (git commit, library
+versions, CPU count) so runs can be compared between commits. Runs
+offline against the checked-in .pkl models; the prediction cache is
+disabled and no request is authenticated, so nothing is written to the
+database.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from models import ml_model
+
+FULL_SIZES = [1, 10, 100, 1000, 10_000, 100_000]
+QUICK_SIZES = [1, 10, 100, 1000]
+
+# Per-row Python paths are capped so a run stays in minutes
+MAX_ROWS = {'scalar_features': 10_000, 'route_single': 1000, 'route_batch': 10_000}
+
+
+def measure(func, rows, min_runs=5, max_runs=200, budget_s=2.0):
+    """Time func() repeatedly; returns latency percentiles and throughput"""
+    func()  # warm-up
+    timings = []
+    deadline = time.perf_counter() + budget_s
+    while len(timings) < max_runs and (len(timings) < min_runs or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    timings_ms = np.array(timings) * 1000
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99])
+    return {
+        "rows": rows,
+        "runs": len(timings),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(timings_ms.mean()), 4),
+        "rows_per_s": round(rows / (float(p50) / 1000), 1) if p50 > 0 else None,
+    }
+
+
+def sample_records(n, seed=0):
+    """Request payloads with the fields the routes require"""
+    columns = ml_model.sample_input_columns(n, seed)
+    records = []
+    for i in range(n):
+        record = {field: columns[field][i].item() for field in ml_model.HOURLY_INPUT_FIELDS}
+        record['date'] = f"2012-{record['mnth']:02d}-{int(columns['day'][i]) % 28 + 1:02d}"
+        records.append(record)
+    return records
+
+
+def bench_features(sizes):
+    results = []
+    for size in sizes:
+        columns = ml_model.sample_input_columns(size)
+        results.append(dict(case="daily_feature_matrix", **measure(
+            lambda: ml_model.daily_feature_matrix(columns), size)))
+        results.append(dict(case="hourly_feature_matrix", **measure(
+            lambda: ml_model.hourly_feature_matrix(columns), size)))
+
+        if size <= MAX_ROWS['scalar_features']:
+            records = sample_records(size)
+            results.append(dict(case="engineer_daily_features", **measure(
+                lambda: [ml_model.engineer_daily_features(r) for r in records], size)))
+            results.append(dict(case="engineer_hourly_features", **measure(
+                lambda: [ml_model.engineer_hourly_features(r) for r in records], size)))
+    return results
+
+
+def bench_models(sizes):
+    ml_model.ensure_models_loaded()
+    daily = ml_model.MODEL_REGISTRY.current('daily').model
+    hourly = ml_model.MODEL_REGISTRY.current('hourly').model
+
+    results = []
+    for size in sizes:
+        columns = ml_model.sample_input_columns(size)
+        daily_features = ml_model.daily_feature_matrix(columns)
+        hourly_features = ml_model.hourly_feature_matrix(columns)
+        results.append(dict(case="DAILY_MODEL.predict", **measure(
+            lambda: daily.predict(daily_features), size)))
+        results.append(dict(case="HOURLY_MODEL.predict", **measure(
+            lambda: hourly.predict(hourly_features), size)))
+    return results
+
+
+def bench_routes(sizes):
+    from app import app
+
+    client = app.test_client()
+
+    def post_each(path, records):
+        for record in records:
+            response = client.post(path, json=record)
+            assert response.status_code == 200, response.get_json()
+
+    def post_batch(records):
+        response = client.post('/api/predictions/batch', json={"records": records})
+        assert response.status_code == 200, response.get_json()
+
+    results = []
+    for size in sizes:
+        records = sample_records(size, seed=size)
+        if size <= MAX_ROWS['route_single']:
+            results.append(dict(case="POST /api/predictions/daily", **measure(
+                lambda: post_each('/api/predictions/daily', records), size)))
+            results.append(dict(case="POST /api/predictions/hourly", **measure(
+                lambda: post_each('/api/predictions/hourly', records), size)))
+        if size <= MAX_ROWS['route_batch']:
+            batch = [dict(record, type='hourly') for record in records]
+            results.append(dict(case="POST /api/predictions/batch (hourly)", **measure(
+                lambda: post_batch(batch), size)))
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    try:
+        import xgboost
+        xgboost_version = xgboost.__version__
+    except ImportError:
+        xgboost_version = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "xgboost": xgboost_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "daily_engine": ml_model.Config.DAILY_INFERENCE_ENGINE,
+        "hourly_engine": ml_model.Config.HOURLY_INFERENCE_ENGINE,
+    }
+
+
+def compare(previous, current):
+    """Print p50 change per case/size against a previous run"""
+    baseline = {(r['group'], r['case'], r['rows']): r for r in previous['results']}
+    print(f"\nComparison with {previous['environment'].get('git_commit')}")
+    for result in current['results']:
+        old = baseline.get((result['group'], result['case'], result['rows']))
+        if old and old['p50_ms']:
+            change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100
+            print(f"  {result['case']:<40} {result['rows']:>7} rows  "
+                  f"p50 {old['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RideWise inference benchmarks")
+    parser.add_argument('--quick', action='store_true', help="batch sizes up to 1k only")
+    parser.add_argument('--sizes', type=int, nargs='+', help="explicit batch sizes")
+    parser.add_argument('--groups', nargs='+', default=['features', 'models', 'routes'],
+                        choices=['features', 'models', 'routes'])
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else FULL_SIZES)
+
+    # Measure the full path every time, not cache hits
+    ml_model.PREDICTION_CACHE.maxsize = 0
+
+    runners = {'features': bench_features, 'models': bench_models, 'routes': bench_routes}
+    results = []
+    for group in args.groups:
+        for result in runners[group](sizes):
+            result = dict(group=group, **result)
+            results.append(result)
+            print(f"{group:<9} {result['case']:<40} {result['rows']:>7} rows  "
+                  f"p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+                  f"p99 {result['p99_ms']:>10.3f} ms  {result['rows_per_s'] or 0:>12.0f} rows/s")
+
+    report = {"environment": environment(), "sizes": sizes, "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
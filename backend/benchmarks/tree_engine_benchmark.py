@@ -0,0 +1,50 @@
+"""
+Latency of the compiled numpy tree engine vs XGBoost for small batches.
+
+    python -m benchmarks.tree_engine_benchmark [--repeat 300]
+
+The batch size where numpy stops beating the booster is the value for
+NUMPY_ENGINE_MAX_ROWS.
+"""
+import argparse
+import pickle
+
+from config import Config
+from models.engines import BoosterEngine, NumpyTreeEngine
+from models.ml_model import daily_feature_matrix, hourly_feature_matrix, sample_input_columns
+from benchmarks.booster_benchmark import time_call
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+def benchmark_model(label, pickle_path, build_matrix, repeat):
+    with open(pickle_path, 'rb') as f:
+        sklearn_model = pickle.load(f)
+    booster_engine = BoosterEngine.from_sklearn(sklearn_model)
+    numpy_engine = NumpyTreeEngine.from_sklearn(sklearn_model)
+
+    features = build_matrix(sample_input_columns(max(BATCH_SIZES), seed=1))
+    diff = numpy_engine.verify(sklearn_model, build_matrix(sample_input_columns(10_000)))
+
+    print(f"\n{label} model: {len(numpy_engine.roots)} trees, depth {numpy_engine.depth}, "
+          f"max diff vs XGBoost {diff:.3g}")
+    print(f"  {'rows':>5} {'sklearn ms':>11} {'booster ms':>11} {'numpy ms':>9}")
+    for size in BATCH_SIZES:
+        batch = features[:size]
+        sk = time_call(lambda: sklearn_model.predict(batch), repeat)
+        bo = time_call(lambda: booster_engine.predict(batch), repeat)
+        np_ms = time_call(lambda: numpy_engine.predict(batch), repeat)
+        print(f"  {size:>5} {sk:>11.3f} {bo:>11.3f} {np_ms:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="numpy tree engine vs XGBoost latency")
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    benchmark_model('Daily', Config.DAILY_MODEL_PATH, daily_feature_matrix, args.repeat)
+    benchmark_model('Hourly', Config.HOURLY_MODEL_PATH, hourly_feature_matrix, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from utils.database import get_db
+from utils.pagination import decode_cursor, fetch_page, page_size
+import logging
+
+logger = logging.getLogger(__name__)
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
@@ -65,60 +69,45 @@ def chatbot_message():
     if request.method == "OPTIONS":
         return jsonify({"status":  "ok"}), 200
 
-    print("\n" + "="*50)
-    print("🔵 CHATBOT MESSAGE ENDPOINT HIT")
-    print("="*50)
-
     try:
-        # Check Authorization header
-        auth_header = request.headers.get('Authorization')
-        print(f"🔑 Authorization header: {auth_header[: 50] if auth_header else 'MISSING'}...")
-
         # Verify JWT manually first
         try:
             verify_jwt_in_request()
             username = get_jwt_identity()
-            print(f"✅ JWT verified, username: {username}")
         except Exception as jwt_error:
-            print(f"❌ JWT verification failed:  {jwt_error}")
+            logger.info("JWT verification failed: %s", jwt_error)
             return jsonify({"success": False, "error": "Authentication failed.  Please log in again."}), 401
 
         # Get request data
         data = request.get_json()
-        print(f"📦 Request data: {data}")
 
         if not data:
-            print("❌ No JSON data received")
             return safe_error("No data provided")
 
         message = data.get("message", "").strip()
-        print(f"📩 Message: '{message}'")
+        logger.debug("Chat message received (%d chars)", len(message))
 
         if not message:
-            print("❌ Empty message")
             return safe_error("Message cannot be empty")
 
         # Database operations
         try:
             conn = get_db()
             cursor = conn.cursor()
-            print("✅ Database connection established")
         except Exception as db_error:
-            print(f"❌ Database connection failed: {db_error}")
+            logger.error("Database connection failed: %s", db_error)
             return safe_error("Database connection failed")
 
         # Get user ID
         user_id = get_user_id(cursor, username)
-        print(f"👤 User ID: {user_id}")
 
         if not user_id:
             conn.close()
-            print("❌ User not found in database")
+            logger.warning("Chat user not found: %s", username)
             return safe_error("User not found")
 
         # Generate response
         response = generate_response(message)
-        print(f"🤖 Generated response: {response[: 100]}...")
 
         # Save to database
         try:
@@ -130,24 +119,17 @@ def chatbot_message():
                 (user_id, message, response, "text")
             )
             conn.commit()
-            print("✅ Chat saved to database")
         except Exception as save_error:
-            print(f"❌ Failed to save chat: {save_error}")
+            logger.error("Failed to save chat: %s", save_error)
             conn.close()
             return safe_error("Failed to save message")
 
         conn.close()
 
-        print("✅ Success!  Returning response")
-        print("="*50 + "\n")
-
         return jsonify({"success":  True, "response": response}), 200
 
     except Exception as e:
-        print(f"❌ UNEXPECTED ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        print("="*50 + "\n")
+        logger.exception("Chatbot message error: %s", e)
         return jsonify({"success": False, "error": "Internal server error"}), 500
 
 
@@ -161,27 +143,26 @@ def chatbot_history():
         verify_jwt_in_request()
         username = get_jwt_identity()
 
-        limit = int(request.args.get("limit", 20))
+        try:
+            limit = page_size(request.args.get("limit"))
+            cursor = request.args.get("cursor") or None
+            if cursor is not None:
+                decode_cursor(cursor)
+        except ValueError:
+            return safe_error("Invalid limit or cursor")
 
         conn = get_db()
-        cursor = conn.cursor()
 
-        user_id = get_user_id(cursor, username)
+        user_id = get_user_id(conn.cursor(), username)
 
         if not user_id:
             conn.close()
             return safe_error("User not found")
 
-        rows = cursor.execute(
-            """
-            SELECT message, response, source, created_at
-            FROM chat_history
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            (user_id, limit)
-        ).fetchall()
+        rows, next_cursor = fetch_page(
+            conn, "chat_history", ("message", "response", "source", "created_at"),
+            user_id, limit, cursor
+        )
 
         conn.close()
 
@@ -192,10 +173,13 @@ def chatbot_history():
             "created_at": r["created_at"]
         } for r in rows]
 
-        return jsonify({"success": True, "history": history}), 200
+        return jsonify({
+            "success": True,
+            "history": history,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }), 200
 
     except Exception as e:
-        print(f"❌ History error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Chat history error: %s", e)
         return jsonify({"success": False, "error": "Failed to load history"}), 500
\ No newline at end of file
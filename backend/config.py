@@ -18,11 +18,114 @@ class Config:
 
     # Database
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/ridewise.db')
+    # Apply pending schema migrations when the app starts (python -m utils.migrations)
+    DB_MIGRATE_ON_STARTUP = os.getenv('DB_MIGRATE_ON_STARTUP', 'True') == 'True'
+    # Idle connections kept for reuse, and per-connection SQLite pragmas
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+    DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+    DB_CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '8192'))
+    DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
 
     # Models
     DAILY_MODEL_PATH = os.getenv('DAILY_MODEL_PATH', 'models/xgb_day_new.pkl')
     HOURLY_MODEL_PATH = os. getenv('HOURLY_MODEL_PATH', 'models/xgb_hour_new.pkl')
 
+    # Native XGBoost exports (python -m models.export_models)
+    DAILY_BOOSTER_PATH = os.getenv('DAILY_BOOSTER_PATH', 'models/xgb_day_new.ubj')
+    HOURLY_BOOSTER_PATH = os.getenv('HOURLY_BOOSTER_PATH', 'models/xgb_hour_new.ubj')
+
+    # Inference engine per model: 'sklearn' (pickled wrapper), 'booster'
+    # (native XGBoost inplace_predict) or 'numpy' (compiled trees, small batches)
+    DAILY_INFERENCE_ENGINE = os.getenv('DAILY_INFERENCE_ENGINE', 'sklearn')
+    HOURLY_INFERENCE_ENGINE = os.getenv('HOURLY_INFERENCE_ENGINE', 'sklearn')
+    INFERENCE_NTHREAD = int(os.getenv('INFERENCE_NTHREAD', '0'))  # 0 = XGBoost default
+    # Largest batch the 'numpy' engine evaluates itself; bigger ones go to
+    # the booster it was compiled from (measured cut-over: ~32 rows)
+    NUMPY_ENGINE_MAX_ROWS = int(os.getenv('NUMPY_ENGINE_MAX_ROWS', '32'))
+
+    # Load and warm the models in a background thread at startup
+    # (otherwise they load on the first prediction)
+    MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'True') == 'True'
+
+    # Inference backend: 'thread' (in the request thread) or 'process'
+    # (forked worker pool sharing the loaded models, scales past the GIL)
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'thread')
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', '0'))  # 0 = one per CPU
+    INFERENCE_POOL_MAX_ROWS = int(os.getenv('INFERENCE_POOL_MAX_ROWS', '65536'))
+
+    # Hot reload: poll model files for mtime changes every N seconds (0 = off)
+    MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', '0'))
+
+    # Admin endpoints (/api/admin) require this token in X-Admin-Token;
+    # they are disabled while it is empty
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+    # Micro-batching of concurrent single predictions into one model call
+    MICRO_BATCH_ENABLED = os.getenv('MICRO_BATCH_ENABLED', 'False') == 'True'
+    MICRO_BATCH_MAX_SIZE = int(os.getenv('MICRO_BATCH_MAX_SIZE', '64'))
+    MICRO_BATCH_WINDOW_MS = float(os.getenv('MICRO_BATCH_WINDOW_MS', '2'))
+
+    # Batch predictions
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '10000'))
+    MAX_HORIZON_DAYS = int(os.getenv('MAX_HORIZON_DAYS', '366'))
+    MAX_SWEEP_POINTS = int(os.getenv('MAX_SWEEP_POINTS', '10000'))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '5000'))  # CSV rows per model call
+
+    # Prediction cache (size 0 disables it, TTL 0 means entries never expire)
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '4096'))
+    PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '0'))
+    PREDICTION_CACHE_DECIMALS = int(os.getenv('PREDICTION_CACHE_DECIMALS', '6'))
+
+    # Saved predictions are queued and inserted by a background thread in
+    # batches of PREDICTION_FLUSH_ROWS or every PREDICTION_FLUSH_MS. When the
+    # queue is full PREDICTION_OVERFLOW applies: 'block', 'drop' (counted) or
+    # 'spill' (JSON lines at PREDICTION_SPILL_PATH, replayed later)
+    PREDICTION_WRITE_BEHIND = os.getenv('PREDICTION_WRITE_BEHIND', 'True') == 'True'
+    PREDICTION_FLUSH_ROWS = int(os.getenv('PREDICTION_FLUSH_ROWS', '500'))
+    PREDICTION_FLUSH_MS = float(os.getenv('PREDICTION_FLUSH_MS', '200'))
+    PREDICTION_QUEUE_SIZE = int(os.getenv('PREDICTION_QUEUE_SIZE', '10000'))
+    PREDICTION_OVERFLOW = os.getenv('PREDICTION_OVERFLOW', 'spill')
+    PREDICTION_SPILL_PATH = os.getenv('PREDICTION_SPILL_PATH', 'data/prediction_spill.jsonl')
+
+    # Lookup-table fast path for single predictions (python -m models.lookup_table).
+    # Interpolated, so approximate: see the error bound in the sidecar JSON.
+    # Grids are points for temp,atemp,hum,windspeed,day_sin
+    LOOKUP_TABLE_ENABLED = os.getenv('LOOKUP_TABLE_ENABLED', 'False') == 'True'
+    DAILY_LOOKUP_TABLE_PATH = os.getenv('DAILY_LOOKUP_TABLE_PATH', 'models/lookup_daily.npy')
+    HOURLY_LOOKUP_TABLE_PATH = os.getenv('HOURLY_LOOKUP_TABLE_PATH', 'models/lookup_hourly.npy')
+    DAILY_LOOKUP_GRID = os.getenv('DAILY_LOOKUP_GRID', '9,9,5,5,5')
+    HOURLY_LOOKUP_GRID = os.getenv('HOURLY_LOOKUP_GRID', '5,5,3,3,3')
+
+    # Background jobs (bulk scoring, PDF parsing, warm-up) queued in SQLite.
+    # Results are kept JOB_RESULT_TTL seconds; a running job whose worker
+    # hasn't heartbeated for JOB_STALE_SECONDS is re-queued (up to
+    # JOB_MAX_ATTEMPTS runs) or marked failed
+    JOB_RUNNER_ENABLED = os.getenv('JOB_RUNNER_ENABLED', 'True') == 'True'
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_DIR = os.getenv('JOB_DIR', 'data/jobs')
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', str(24 * 3600)))
+    JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', '30'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))
+
+    # History endpoints page with cursors; ?limit= is capped at MAX_PAGE_SIZE
+    DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', '20'))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', '100'))
+    # /export endpoints stream full histories, reading this many rows at a time
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+
+    # Per-stage latency histograms served at /api/metrics
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+
+    # Logging: JSON lines (or 'text') written by a background thread.
+    # LOG_LEVELS sets per-logger levels, e.g. "models.ml_model=DEBUG,services=WARNING";
+    # LOG_DEBUG_SAMPLE_RATE keeps that fraction of DEBUG records
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+
     # File Upload
     UPLOAD_FOLDER = 'uploads'
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
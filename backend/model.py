@@ -1,11 +1,16 @@
 import pickle
 import numpy as np
+import logging
 import os
+import threading
 from datetime import datetime
 
-# Load models at module level
+logger = logging.getLogger(__name__)
+
+# Models are loaded on first prediction
 DAILY_MODEL = None
 HOURLY_MODEL = None
+_LOAD_LOCK = threading.Lock()
 
 def load_models():
     """Load both models when module is imported"""
@@ -18,22 +23,31 @@ def load_models():
     if os. path.exists(daily_model_path):
         with open(daily_model_path, 'rb') as f:
             DAILY_MODEL = pickle.load(f)
-        print(f"✓ Daily model loaded from {daily_model_path}")
+        logger.info("Daily model loaded from %s", daily_model_path)
         if hasattr(DAILY_MODEL, 'n_features_in_'):
-            print(f"  Expects {DAILY_MODEL. n_features_in_} features")
+            logger.info("Daily model expects %d features", DAILY_MODEL.n_features_in_)
     else:
         raise FileNotFoundError(f"❌ Daily model not found at {daily_model_path}")
 
     if os.path.exists(hourly_model_path):
         with open(hourly_model_path, 'rb') as f:
             HOURLY_MODEL = pickle.load(f)
-        print(f"✓ Hourly model loaded from {hourly_model_path}")
+        logger.info("Hourly model loaded from %s", hourly_model_path)
         if hasattr(HOURLY_MODEL, 'n_features_in_'):
-            print(f"  Expects {HOURLY_MODEL. n_features_in_} features")
+            logger.info("Hourly model expects %d features", HOURLY_MODEL.n_features_in_)
     else:
         raise FileNotFoundError(f"❌ Hourly model not found at {hourly_model_path}")
 
-load_models()
+
+def ensure_models_loaded():
+    """Load the models on first use; concurrent first requests load them once"""
+    if DAILY_MODEL is not None and HOURLY_MODEL is not None:
+        return
+
+    with _LOAD_LOCK:
+        if DAILY_MODEL is None or HOURLY_MODEL is None:
+            load_models()
+
 
 def engineer_daily_features(features_dict):
     """
@@ -209,42 +223,34 @@ def engineer_hourly_features(features_dict):
 
 def predict_daily(features_dict):
     """Predict daily bike rentals"""
-    if DAILY_MODEL is None:
-        raise RuntimeError("Daily model not loaded")
+    ensure_models_loaded()
 
     try:
         features = engineer_daily_features(features_dict)
-        print(f"Daily prediction - features shape:  {features.shape}")
 
         prediction = DAILY_MODEL.predict(features)[0]
         result = max(0, float(prediction))
 
-        print(f"Daily prediction result: {int(result)} bikes")
+        logger.debug("Daily prediction result: %d bikes", int(result))
         return result
 
     except Exception as e:
-        print(f"Daily prediction error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Daily prediction error: %s", e)
         raise
 
 def predict_hourly(features_dict):
     """Predict hourly bike rentals"""
-    if HOURLY_MODEL is None:
-        raise RuntimeError("Hourly model not loaded")
+    ensure_models_loaded()
 
     try:
         features = engineer_hourly_features(features_dict)
-        print(f"Hourly prediction - features shape: {features.shape}")
 
         prediction = HOURLY_MODEL. predict(features)[0]
         result = max(0, float(prediction))
 
-        print(f"Hourly prediction result: {int(result)} bikes")
+        logger.debug("Hourly prediction result: %d bikes", int(result))
         return result
 
     except Exception as e:
-        print(f"Hourly prediction error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Hourly prediction error: %s", e)
         raise
\ No newline at end of file
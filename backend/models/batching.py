@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Upper bounds for the batch-size and queue-wait histograms
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_MS_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one model call.
+
+    Callers submit one feature row and get a Future. A worker thread
+    takes the first queued row, keeps collecting until max_batch_size rows
+    are queued or window_ms has passed, then runs predict_fn(matrix, key)
+    once per distinct key on the stacked rows and resolves each Future
+    with its own value. The key (e.g. the model version a request pinned)
+    keeps rows submitted for different models out of the same call.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, window_ms=2.0, name='batcher'):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.wait_ms_counts = [0] * (len(WAIT_MS_BUCKETS) + 1)
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def submit(self, row, key=None):
+        """Queue one feature row to be scored with `key`; returns a Future for its prediction"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64).reshape(-1), future,
+                         time.perf_counter(), key))
+        return future
+
+    def predict(self, row, key=None):
+        """Blocking single-row prediction through the batcher"""
+        return self.submit(row, key).result()
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """Block for the first item, then fill the batch until size or window is hit"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            # One predict_fn call per key, in order of first appearance
+            groups = {}
+            for row, future, _, key in batch:
+                rows, futures = groups.setdefault(id(key), (key, [], []))[1:]
+                rows.append(row)
+                futures.append(future)
+
+            for key, rows, futures in groups.values():
+                try:
+                    predictions = self.predict_fn(np.vstack(rows), key)
+                    for future, value in zip(futures, predictions):
+                        future.set_result(value)
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+
+            self._record(len(batch), [(started - queued) * 1000 for _, _, queued, _ in batch])
+
+    def _record(self, size, waits_ms):
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.batch_size_counts[_bucket(size, BATCH_SIZE_BUCKETS)] += 1
+            for wait in waits_ms:
+                self.wait_ms_counts[_bucket(wait, WAIT_MS_BUCKETS)] += 1
+                self.wait_ms_total += wait
+                self.wait_ms_max = max(self.wait_ms_max, wait)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "window_ms": self.window * 1000,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "batch_size_histogram": _histogram(BATCH_SIZE_BUCKETS, self.batch_size_counts),
+                "queue_wait_ms": {
+                    "avg": round(self.wait_ms_total / self.items, 4) if self.items else 0.0,
+                    "max": round(self.wait_ms_max, 4),
+                    "histogram": _histogram(WAIT_MS_BUCKETS, self.wait_ms_counts),
+                },
+            }
+
+
+def _bucket(value, bounds):
+    """Index of the first bucket whose upper bound is >= value"""
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def _histogram(bounds, counts):
+    labels = [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+    return dict(zip(labels, counts))
@@ -0,0 +1,167 @@
+import json
+
+import numpy as np
+
+
+class BoosterEngine:
+    """
+    Inference through the native XGBoost Booster.
+
+    Skips the sklearn wrapper (input validation and DMatrix construction on
+    every call) and uses inplace_predict on a float32 C-contiguous matrix.
+    Exposes predict() and n_features_in_ so it can stand in for the
+    unpickled XGBRegressor.
+    """
+
+    name = 'booster'
+
+    def __init__(self, booster, nthread=0):
+        self.booster = booster
+        if nthread:
+            self.booster.set_param({'nthread': nthread})
+        self.n_features_in_ = booster.num_features()
+
+    @classmethod
+    def from_file(cls, path, nthread=0):
+        """Load a booster saved in XGBoost's JSON/UBJ format (no pickle)"""
+        import xgboost as xgb  # deferred: importing xgboost is slow
+
+        booster = xgb.Booster()
+        booster.load_model(path)
+        return cls(booster, nthread)
+
+    @classmethod
+    def from_sklearn(cls, model, nthread=0):
+        return cls(model.get_booster(), nthread)
+
+    def predict(self, features):
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        return self.booster.inplace_predict(features)
+
+
+class NumpyTreeEngine:
+    """
+    Pure-NumPy evaluator for a compiled XGBoost tree ensemble.
+
+    Every tree is flattened into shared arrays (split feature, threshold,
+    left/right child, default direction, leaf value). Rows walk all trees
+    at once, one tree level per step, using vectorized gathers; leaves
+    point to themselves so finished trees stay put.
+
+    Only faster than XGBoost while its per-call overhead dominates: up to
+    about 32 rows on the shipped models, slower from 64 rows up (see
+    benchmarks.tree_engine_benchmark). Given a `fallback` engine, batches
+    larger than `max_rows` are sent to it instead.
+    """
+
+    name = 'numpy'
+
+    # Objectives whose prediction is the raw margin
+    IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:linear', 'reg:absoluteerror',
+                           'reg:pseudohubererror', 'reg:quantileerror')
+
+    def __init__(self, booster, fallback=None, max_rows=None):
+        self.fallback = fallback
+        self.max_rows = max_rows
+
+        model = json.loads(booster.save_raw('json'))
+        learner = model['learner']
+
+        objective = learner['objective']['name']
+        if objective not in self.IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for numpy engine: {objective}")
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError("numpy engine only supports gbtree models")
+
+        # '[1.9E2]' in newer XGBoost releases, '1.9E2' in older ones
+        base_score = learner['learner_model_param']['base_score'].strip('[]')
+        self.base_score = np.float32(base_score)
+        self.n_features_in_ = int(learner['learner_model_param']['num_feature'])
+
+        self._compile(learner['gradient_booster']['model']['trees'])
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(model.get_booster())
+
+    def _compile(self, trees):
+        features, thresholds, lefts, defaults, values, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+
+        for tree in trees:
+            if any(tree.get('split_type', [])):
+                raise ValueError("numpy engine does not support categorical splits")
+
+            # Renumber breadth-first so every right child is left child + 1
+            left_children, right_children = tree['left_children'], tree['right_children']
+            order, level, tree_depth = [0], [0], 0
+            while True:
+                level = [child for node in level if left_children[node] != -1
+                         for child in (left_children[node], right_children[node])]
+                if not level:
+                    break
+                order.extend(level)
+                tree_depth += 1
+            position = {node: i for i, node in enumerate(order)}
+
+            for node in order:
+                condition = np.float32(tree['split_conditions'][node])
+                if left_children[node] == -1:
+                    # Leaves loop back to themselves: NaN threshold never goes right
+                    features.append(0)
+                    thresholds.append(np.float32(np.nan))
+                    lefts.append(offset + position[node])
+                    defaults.append(True)
+                    values.append(condition)
+                else:
+                    features.append(tree['split_indices'][node])
+                    thresholds.append(condition)
+                    lefts.append(offset + position[left_children[node]])
+                    defaults.append(bool(tree['default_left'][node]))
+                    values.append(np.float32(0))
+
+            roots.append(offset)
+            depth = max(depth, tree_depth)
+            offset += len(order)
+
+        self.feature = np.asarray(features, dtype=np.intp)
+        self.threshold = np.asarray(thresholds, dtype=np.float32)
+        self.left = np.asarray(lefts, dtype=np.intp)
+        self.default_right = ~np.asarray(defaults, dtype=bool)
+        self.value = np.asarray(values, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = depth
+
+    def predict(self, features):
+        if self.fallback is not None and self.max_rows is not None and len(features) > self.max_rows:
+            return self.fallback.predict(features)
+        return self.predict_trees(features)
+
+    def predict_trees(self, features):
+        """Evaluate the compiled trees, whatever the batch size"""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        n_rows, n_features = features.shape
+        flat = features.reshape(-1)
+        row_offset = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.depth):
+            x = flat.take(self.feature.take(node) + row_offset)
+            # XGBoost goes left when x < threshold; NaN follows the default
+            go_right = x >= self.threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_right = np.where(missing, self.default_right.take(node), go_right)
+            node = self.left.take(node) + go_right
+
+        margin = self.value.take(node).sum(axis=1, dtype=np.float64) + self.base_score
+        return margin.astype(np.float32)
+
+    def verify(self, reference, features, rtol=1e-5, atol=1e-3):
+        """Max abs difference against a reference engine; raises if outside tolerance"""
+        expected = reference.predict(features)
+        actual = self.predict_trees(features)
+        diff = float(np.abs(expected - actual).max()) if len(expected) else 0.0
+        if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+            raise ValueError(f"numpy engine disagrees with reference (max diff {diff})")
+        return diff
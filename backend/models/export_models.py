@@ -0,0 +1,55 @@
+"""
+Export the pickled sklearn models to XGBoost's native format.
+
+    python -m models.export_models            # writes the UBJ files from Config
+    python -m models.export_models --format json
+
+The loader looks for DAILY_BOOSTER_PATH / HOURLY_BOOSTER_PATH and, if that
+file is missing, the same name with the other extension, so a JSON export
+is picked up without changing the configured paths.
+
+Native files load without unpickling arbitrary objects and are used by the
+'booster' inference engine (DAILY_INFERENCE_ENGINE / HOURLY_INFERENCE_ENGINE).
+"""
+import argparse
+import os
+import pickle
+
+from config import Config
+
+
+def export_native(pickle_path, output_path):
+    """Save the booster inside a pickled XGBRegressor as JSON/UBJ"""
+    with open(pickle_path, 'rb') as f:
+        model = pickle.load(f)
+
+    model.get_booster().save_model(output_path)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export models to native XGBoost format")
+    parser.add_argument('--format', choices=['ubj', 'json'], default=None,
+                        help="Override the extension of the configured output paths "
+                             "(the loader finds either; if both exist the configured one wins)")
+    args = parser.parse_args()
+
+    pairs = [
+        (Config.DAILY_MODEL_PATH, Config.DAILY_BOOSTER_PATH),
+        (Config.HOURLY_MODEL_PATH, Config.HOURLY_BOOSTER_PATH),
+    ]
+
+    for pickle_path, output_path in pairs:
+        if args.format:
+            output_path = os.path.splitext(output_path)[0] + '.' + args.format
+
+        if not os.path.exists(pickle_path):
+            print(f"⚠ Model not found at {pickle_path}")
+            continue
+
+        export_native(pickle_path, output_path)
+        print(f"✓ Exported {pickle_path} -> {output_path}")
+
+
+if __name__ == '__main__':
+    main()
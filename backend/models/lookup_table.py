@@ -0,0 +1,331 @@
+"""
+Precomputed prediction tables for the daily and hourly models.
+
+    python -m models.lookup_table                      # build both tables
+    python -m models.lookup_table --model hourly --grid 9,9,5,5,5
+
+Every discrete input the model actually splits on (yr, holiday,
+workingday, weekday, month, season_4, hour, weathersit_3) becomes a key,
+and the continuous inputs (temp, atemp, hum, windspeed and day_sin) are
+sampled on a regular grid. Raw model outputs are stored as a .npy array
+that is memory-mapped at serve time. A lookup is one slice of 2^5 corners
+and a multilinear interpolation, with no XGBoost call.
+
+The sidecar JSON next to each table records the grid, the checksum of the
+model file it was built from, and the error bound. The bound is the
+absolute difference from exact inference, measured on random inputs after
+the build (mean/p50/p95/p99/max). Tree ensembles are step functions, so
+interpolation error shrinks only slowly with grid size. Use the table
+where a small approximation is acceptable (e.g. sliders) and keep exact
+inference for everything else: pass "exact": true, or set
+LOOKUP_TABLE_ENABLED=False.
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+from itertools import product
+
+import numpy as np
+
+from config import Config
+
+# Continuous axes, in table order, with the range the grid spans
+AXES = (('temp', 0.0, 1.0), ('atemp', 0.0, 1.0), ('hum', 0.0, 1.0),
+        ('windspeed', 0.0, 1.0), ('day_sin', -1.0, 1.0))
+
+# Discrete key dimensions: input field -> (input value -> key index, features it drives).
+# Values that produce identical features share an index (e.g. season 1-3 -> season_4 = 0).
+_BINARY = {0: 0, 1: 1}
+_SHARED_KEYS = [
+    ('yr', _BINARY, ('yr',)),
+    ('holiday', _BINARY, ('holiday',)),
+    ('workingday', _BINARY, ('workingday',)),
+    ('weekday', {d: d for d in range(7)}, ('weekday_sin', 'weekday_cos', 'is_weekend')),
+    ('mnth', {m: m - 1 for m in range(1, 13)}, ('mnth_sin', 'mnth_cos')),
+    ('season', {1: 0, 2: 0, 3: 0, 4: 1}, ('season_4',)),
+]
+KEY_DIMS = {
+    'daily': _SHARED_KEYS + [
+        ('weathersit', {w: w - 1 for w in range(1, 5)}, ('weather_temp_interaction',)),
+    ],
+    'hourly': _SHARED_KEYS + [
+        ('weathersit', {1: 0, 2: 0, 3: 1, 4: 0}, ('weathersit_3',)),
+        ('hr', {h: h for h in range(24)},
+         ('hr_sin', 'hr_cos', 'is_peak_hour', 'time_of_day_morning', 'time_of_day_evening')),
+    ],
+}
+
+ROWS_PER_CHUNK = 1 << 20
+
+
+def table_paths(model_type):
+    """(table .npy, sidecar .json) for a model type"""
+    path = Config.DAILY_LOOKUP_TABLE_PATH if model_type == 'daily' else Config.HOURLY_LOOKUP_TABLE_PATH
+    return path, os.path.splitext(path)[0] + '.json'
+
+
+def parse_grid(spec):
+    """'9,9,5,5,5' -> [9, 9, 5, 5, 5] points for temp, atemp, hum, windspeed, day_sin"""
+    points = [int(p) for p in str(spec).split(',')]
+    if len(points) != len(AXES) or min(points) < 2:
+        raise ValueError(f"Grid needs {len(AXES)} axis sizes of at least 2, got {spec!r}")
+    return points
+
+
+def day_sin(day):
+    return np.sin(2 * np.pi * day / 31)
+
+
+class LookupTable:
+    """A built table, memory-mapped read-only"""
+
+    def __init__(self, values, meta, defaults=None):
+        self.values = values
+        self.meta = meta
+        self.model_type = meta['model_type']
+        self.checksum = meta['model_checksum']
+        self.defaults = defaults or {}
+        self.key_fields = [(k['field'], {int(v): i for v, i in k['codes'].items()})
+                           for k in meta['key_fields']]
+        self.key_sizes = [max(codes.values()) + 1 for _, codes in self.key_fields]
+        self.axes = [(a['name'], a['min'], a['max'], a['points']) for a in meta['axes']]
+
+    @classmethod
+    def load(cls, path, meta_path, defaults=None):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        values = np.load(path, mmap_mode='r')
+        if list(values.shape) != meta['shape']:
+            raise ValueError(f"{path} has shape {values.shape}, sidecar says {meta['shape']}")
+        return cls(values, meta, defaults)
+
+    def _key_index(self, features_dict):
+        index = 0
+        for (field, codes), size in zip(self.key_fields, self.key_sizes):
+            value = features_dict.get(field, self.defaults.get(field))
+            code = codes.get(int(value))
+            if code is None:
+                return None
+            index = index * size + code
+        return index
+
+    def lookup(self, features_dict, day):
+        """
+        Interpolated raw prediction for one feature dict, or None when the
+        input is outside the table (unknown key, value off the grid, bad
+        type). Callers fall back to exact inference on None.
+        """
+        try:
+            key = self._key_index(features_dict)
+            coords = [float(features_dict[name]) for name, _, _, _ in self.axes[:-1]]
+        except (KeyError, TypeError, ValueError):
+            return None
+        if key is None:
+            return None
+        coords.append(float(day_sin(day)))
+
+        starts, fracs = [], []
+        for x, (_, low, high, points) in zip(coords, self.axes):
+            if not low <= x <= high:  # also rejects NaN
+                return None
+            pos = (x - low) / (high - low) * (points - 1)
+            i = min(int(pos), points - 2)
+            starts.append(i)
+            fracs.append(pos - i)
+
+        block = self.values[(key,) + tuple(slice(i, i + 2) for i in starts)].astype(np.float64)
+        for f in fracs:
+            block = block[0] * (1 - f) + block[1] * f
+        return float(block)
+
+    def lookup_many(self, keys, coords):
+        """Vectorized lookup for key indices (n,) and coords (n, 5) inside the grid"""
+        keys = np.asarray(keys, dtype=np.intp)
+        coords = np.asarray(coords, dtype=np.float64)
+        starts, fracs = [], []
+        for j, (_, low, high, points) in enumerate(self.axes):
+            pos = (coords[:, j] - low) / (high - low) * (points - 1)
+            i = np.minimum(pos.astype(np.intp), points - 2)
+            starts.append(i)
+            fracs.append(pos - i)
+
+        result = np.zeros(len(keys))
+        for corner in product((0, 1), repeat=len(self.axes)):
+            weight = np.ones(len(keys))
+            index = [keys]
+            for bit, i, f in zip(corner, starts, fracs):
+                weight *= f if bit else 1 - f
+                index.append(i + bit)
+            result += weight * self.values[tuple(index)].astype(np.float64)
+        return result
+
+    def describe(self):
+        return {
+            "model_checksum": self.checksum,
+            "built_at": self.meta['built_at'],
+            "grid": {name: points for name, _, _, points in self.axes},
+            "keys": int(np.prod(self.key_sizes)),
+            "dtype": self.meta['dtype'],
+            "size_bytes": int(self.values.nbytes),
+            "error": self.meta['error'],
+        }
+
+
+def _split_features(path, names):
+    """Names of the features the model at path uses in at least one split"""
+    if path.endswith('.pkl'):
+        with open(path, 'rb') as f:
+            booster = pickle.load(f).get_booster()
+    else:
+        import xgboost as xgb
+        booster = xgb.Booster(model_file=path)
+
+    used = set()
+    for name in booster.get_score(importance_type='weight'):
+        if name not in names and name[1:].isdigit():
+            name = names[int(name[1:])]
+        used.add(name)
+    return used
+
+
+def _key_dims(model_type, used_features):
+    """KEY_DIMS for the model minus dimensions whose features it never splits on"""
+    kept, dropped = [], []
+    for field, codes, features in KEY_DIMS[model_type]:
+        (kept if used_features & set(features) else dropped).append((field, codes))
+    return kept, dropped
+
+
+def _representatives(codes):
+    """One input value per key index"""
+    reps = {}
+    for value, index in sorted(codes.items()):
+        reps.setdefault(index, value)
+    return [reps[i] for i in range(len(reps))]
+
+
+def _grid_rows(axes, points):
+    """All continuous grid points, C order, as (cells, 5)"""
+    lines = [np.linspace(low, high, n) for (_, low, high), n in zip(axes, points)]
+    mesh = np.meshgrid(*lines, indexing='ij')
+    return np.column_stack([m.ravel() for m in mesh])
+
+
+def build_table(model_type, points, dtype='float16', samples=20000, seed=0):
+    """Evaluate the live model on the full grid, write table + sidecar, return the sidecar"""
+    from models.ml_model import (
+        _load_model, _resolve_model_path, _model_config, _stack, sample_input_columns,
+        DAILY_FEATURE_NAMES, HOURLY_FEATURE_NAMES, INPUT_DEFAULTS
+    )
+    from models.registry import file_checksum
+
+    names = DAILY_FEATURE_NAMES if model_type == 'daily' else HOURLY_FEATURE_NAMES
+    build_matrix = _model_config(model_type)[4]
+    model_path = _resolve_model_path(model_type)
+    if model_path is None:
+        raise FileNotFoundError(f"No {model_type} model to build a lookup table from")
+    model = _load_model(model_type, model_path)
+
+    key_dims, dropped = _key_dims(model_type, _split_features(model_path, names))
+    key_sizes = [max(codes.values()) + 1 for _, codes in key_dims]
+    reps = [np.array(_representatives(codes)) for _, codes in key_dims]
+    grid = _grid_rows(AXES, points)
+    cells = len(grid)
+    n_keys = int(np.prod(key_sizes))
+    day_sin_col = names.index('day_sin')
+
+    path, meta_path = table_paths(model_type)
+    shape = [n_keys] + list(points)
+    values = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=dtype, shape=tuple(shape))
+    flat = values.reshape(n_keys, cells)
+
+    # Fill whole key slabs, about ROWS_PER_CHUNK rows per model call
+    keys_per_chunk = max(1, ROWS_PER_CHUNK // cells)
+    all_keys = np.indices(key_sizes).reshape(len(key_sizes), -1).T
+    started = time.perf_counter()
+    for start in range(0, n_keys, keys_per_chunk):
+        chunk = all_keys[start:start + keys_per_chunk]
+        n = len(chunk) * cells
+        columns = {field: np.repeat(rep[chunk[:, j]], cells)
+                   for j, ((field, _), rep) in enumerate(zip(key_dims, reps))}
+        for field, codes in dropped:
+            columns[field] = _representatives(codes)[0]
+        for j, (name, _, _) in enumerate(AXES[:-1]):
+            columns[name] = np.tile(grid[:, j], len(chunk))
+        columns['day'] = np.ones(n)
+
+        matrix = build_matrix(columns)
+        matrix[:, day_sin_col] = np.tile(grid[:, -1], len(chunk))
+        flat[start:start + len(chunk)] = np.asarray(model.predict(matrix)).reshape(len(chunk), cells)
+    build_seconds = time.perf_counter() - started
+    values.flush()
+    del flat, values
+    os.replace(path + '.tmp', path)
+
+    meta = {
+        "model_type": model_type,
+        "model_path": model_path,
+        "model_checksum": file_checksum(model_path),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "build_seconds": round(build_seconds, 2),
+        "dtype": dtype,
+        "shape": shape,
+        "key_fields": [{"field": field, "codes": {str(v): i for v, i in codes.items()}}
+                       for field, codes in key_dims],
+        "ignored_fields": [field for field, _ in dropped],
+        "axes": [{"name": name, "min": low, "max": high, "points": n}
+                 for (name, low, high), n in zip(AXES, points)],
+    }
+
+    # Error bound against exact inference on random in-grid inputs
+    table = LookupTable(np.load(path, mmap_mode='r'), dict(meta, error=None), INPUT_DEFAULTS)
+    columns = sample_input_columns(samples, seed)
+    records = [{field: columns[field][i] for field, _ in key_dims} for i in range(samples)]
+    keys = np.array([table._key_index(r) for r in records])
+    coords = np.column_stack([columns['temp'], columns['atemp'], columns['hum'],
+                              columns['windspeed'], day_sin(columns['day'])])
+    exact = np.asarray(model.predict(build_matrix(columns)), dtype=np.float64)
+    error = np.abs(table.lookup_many(keys, coords) - exact)
+    meta["error"] = {
+        "samples": samples,
+        "mean_abs": round(float(error.mean()), 3),
+        "p50_abs": round(float(np.percentile(error, 50)), 3),
+        "p95_abs": round(float(np.percentile(error, 95)), 3),
+        "p99_abs": round(float(np.percentile(error, 99)), 3),
+        "max_abs": round(float(error.max()), 3),
+        "mean_prediction": round(float(np.abs(exact).mean()), 3),
+    }
+
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build prediction lookup tables")
+    parser.add_argument('--model', choices=['daily', 'hourly', 'all'], default='all')
+    parser.add_argument('--grid', default=None,
+                        help="Points for temp,atemp,hum,windspeed,day_sin (default from Config)")
+    parser.add_argument('--dtype', choices=['float16', 'float32'], default='float16')
+    parser.add_argument('--samples', type=int, default=20000,
+                        help="Random inputs used to measure the error bound")
+    args = parser.parse_args()
+
+    model_types = ['daily', 'hourly'] if args.model == 'all' else [args.model]
+    for model_type in model_types:
+        spec = args.grid or (Config.DAILY_LOOKUP_GRID if model_type == 'daily' else Config.HOURLY_LOOKUP_GRID)
+        meta = build_table(model_type, parse_grid(spec), args.dtype, args.samples)
+        path, meta_path = table_paths(model_type)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"✓ {model_type} table: {path} ({size_mb:.1f} MB, {meta['shape'][0]} keys, "
+              f"grid {spec}, built in {meta['build_seconds']}s)")
+        print(f"  Error vs exact: mean {meta['error']['mean_abs']}, p95 {meta['error']['p95_abs']}, "
+              f"p99 {meta['error']['p99_abs']}, max {meta['error']['max_abs']} "
+              f"(mean prediction {meta['error']['mean_prediction']}) -> {meta_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,43 +2,351 @@ import pickle
 import numpy as np
 from datetime import datetime
 from config import Config
+from models.batching import MicroBatcher
+from models.engines import BoosterEngine, NumpyTreeEngine
+from models.lookup_table import LookupTable, table_paths
+from models.prediction_cache import PredictionCache
+from models.process_pool import InferencePool
+from models.registry import ModelRegistry
+from utils.metrics import timed
+import logging
 import os
+import threading
 
-# Global model variables
+logger = logging.getLogger(__name__)
+
+# Global model variables (loaded lazily, see ensure_models_loaded)
 DAILY_MODEL = None
 HOURLY_MODEL = None
 
-def load_models():
-    """Load ML models"""
+_LOAD_LOCK = threading.Lock()
+_MODELS_LOADED = threading.Event()
+_MODELS_READY = threading.Event()
+_WARM_UP_ERROR = None
+
+# Micro-batchers for single predictions (created on first use when enabled)
+_BATCHERS = {}
+
+# Process pool for INFERENCE_BACKEND = 'process' (forked on first use)
+_INFERENCE_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# model_type -> (model version, LookupTable or None) for the lookup fast path
+_LOOKUP_TABLES = {}
+
+# Memoized single predictions, cleared whenever the models are reloaded
+PREDICTION_CACHE = PredictionCache(
+    maxsize=Config.PREDICTION_CACHE_SIZE,
+    ttl=Config.PREDICTION_CACHE_TTL,
+    decimals=Config.PREDICTION_CACHE_DECIMALS,
+)
+
+INFERENCE_ENGINES = ('sklearn', 'booster', 'numpy')
+
+def sample_input_columns(n, seed=0):
+    """Random but valid model inputs as columns (engine checks, benchmarks)"""
+    rng = np.random.default_rng(seed)
+    return {
+        'temp': rng.random(n), 'atemp': rng.random(n),
+        'hum': rng.random(n), 'windspeed': rng.random(n),
+        'season': rng.integers(1, 5, n), 'mnth': rng.integers(1, 13, n),
+        'weekday': rng.integers(0, 7, n), 'workingday': rng.integers(0, 2, n),
+        'holiday': rng.integers(0, 2, n), 'weathersit': rng.integers(1, 5, n),
+        'yr': rng.integers(0, 2, n), 'hr': rng.integers(0, 24, n),
+        'day': rng.integers(1, 32, n),
+    }
+
+MODEL_TYPES = ('daily', 'hourly')
+
+# Extensions of native exports (python -m models.export_models --format ...)
+NATIVE_MODEL_FORMATS = ('.ubj', '.json')
+
+def _native_path(path):
+    """The configured native export, or the same file in the other format if only that exists"""
+    if os.path.exists(path):
+        return path
+    stem = os.path.splitext(path)[0]
+    for extension in NATIVE_MODEL_FORMATS:
+        if os.path.exists(stem + extension):
+            return stem + extension
+    return path
+
+def _model_config(model_type):
+    """(label, pickle path, native path, engine, feature builder) for a model type"""
+    if model_type == 'daily':
+        return ('Daily', Config.DAILY_MODEL_PATH, _native_path(Config.DAILY_BOOSTER_PATH),
+                Config.DAILY_INFERENCE_ENGINE, daily_feature_matrix)
+    if model_type == 'hourly':
+        return ('Hourly', Config.HOURLY_MODEL_PATH, _native_path(Config.HOURLY_BOOSTER_PATH),
+                Config.HOURLY_INFERENCE_ENGINE, hourly_feature_matrix)
+    raise ValueError(f"Unknown model type: {model_type}")
+
+def _resolve_model_path(model_type):
+    """File to load for a model type: native export if usable, else the pickle"""
+    label, pickle_path, native_path, engine, _ = _model_config(model_type)
+    if engine not in INFERENCE_ENGINES:
+        raise ValueError(f"Unknown inference engine for {model_type} model: {engine}")
+
+    if engine != 'sklearn' and os.path.exists(native_path):
+        return native_path
+    if os.path.exists(pickle_path):
+        return pickle_path
+
+    logger.warning("%s model not found at %s", label, pickle_path)
+    return None
+
+def _watch_paths(model_type):
+    _, pickle_path, native_path, engine, _ = _model_config(model_type)
+    return [pickle_path, native_path] if engine != 'sklearn' else [pickle_path]
+
+def _load_model(model_type, path):
+    """Load one model file with the configured inference engine"""
+    label, _, native_path, engine, build_matrix = _model_config(model_type)
+
+    if engine != 'sklearn' and path == native_path:
+        model = BoosterEngine.from_file(path, Config.INFERENCE_NTHREAD)
+        logger.info("%s model loaded: %s (native booster)", label, path)
+    else:
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+        if engine != 'sklearn':
+            model = BoosterEngine.from_sklearn(model, Config.INFERENCE_NTHREAD)
+        logger.info("%s model loaded: %s (%s)", label, path, engine)
+
+    if engine == 'numpy':
+        # Compile the trees and check them against XGBoost before serving
+        try:
+            compiled = NumpyTreeEngine(model.booster, fallback=model,
+                                       max_rows=Config.NUMPY_ENGINE_MAX_ROWS)
+            diff = compiled.verify(model, build_matrix(sample_input_columns(2048)))
+            logger.info("%s model compiled to numpy engine (max diff vs XGBoost: %.3g)", label, diff)
+            model = compiled
+        except ValueError as e:
+            logger.warning("Numpy engine unavailable for %s model, using booster: %s", label.lower(), e)
+
+    if hasattr(model, 'n_features_in_'):
+        logger.info("%s model expects %d features", label, model.n_features_in_)
+    return model
+
+def _install_model(model_type, version):
+    """Registry swap hook: publish the new model and drop cached results"""
     global DAILY_MODEL, HOURLY_MODEL
 
+    if model_type == 'daily':
+        DAILY_MODEL = version.model
+    else:
+        HOURLY_MODEL = version.model
+    PREDICTION_CACHE.clear()
+
+MODEL_REGISTRY = ModelRegistry(MODEL_TYPES, _resolve_model_path, _load_model,
+                               on_swap=_install_model)
+
+def load_models():
+    """Load ML models"""
     try:
-        # Load daily model
-        if os.path.exists(Config. DAILY_MODEL_PATH):
-            with open(Config.DAILY_MODEL_PATH, 'rb') as f:
-                DAILY_MODEL = pickle.load(f)
-            print(f"✓ Daily model loaded:  {Config.DAILY_MODEL_PATH}")
-            if hasattr(DAILY_MODEL, 'n_features_in_'):
-                print(f"  Expected features: {DAILY_MODEL. n_features_in_}")
-        else:
-            print(f"⚠ Daily model not found at {Config.DAILY_MODEL_PATH}")
-
-        # Load hourly model
-        if os. path.exists(Config.HOURLY_MODEL_PATH):
-            with open(Config.HOURLY_MODEL_PATH, 'rb') as f:
-                HOURLY_MODEL = pickle.load(f)
-            print(f"✓ Hourly model loaded: {Config.HOURLY_MODEL_PATH}")
-            if hasattr(HOURLY_MODEL, 'n_features_in_'):
-                print(f"  Expected features: {HOURLY_MODEL.n_features_in_}")
-        else:
-            print(f"⚠ Hourly model not found at {Config.HOURLY_MODEL_PATH}")
+        MODEL_REGISTRY.load_all()
+        _MODELS_LOADED.set()
 
     except Exception as e:
-        print(f"❌ Error loading models: {str(e)}")
+        logger.exception("Error loading models: %s", e)
         raise
 
-# Load models on module import
-load_models()
+def reload_models(model_types=None, background=False):
+    """Load new versions of the models and swap them in without downtime"""
+    ensure_models_loaded()
+    if background:
+        return MODEL_REGISTRY.reload_in_background(model_types)
+    return {model_type: MODEL_REGISTRY.load(model_type)
+            for model_type in (model_types or MODEL_TYPES)}
+
+def start_model_watcher(interval):
+    """Reload a model whenever its file's mtime changes"""
+    return MODEL_REGISTRY.start_watcher(_watch_paths, interval)
+
+def ensure_models_loaded():
+    """Load the models on first use; safe to call from many threads"""
+    if _MODELS_LOADED.is_set():
+        return
+
+    with _LOAD_LOCK:
+        if not _MODELS_LOADED.is_set():
+            load_models()
+
+def warm_up():
+    """
+    Load the models and run dummy predictions through them so the first
+    real request doesn't pay for lazy initialisation inside XGBoost.
+    """
+    global _WARM_UP_ERROR
+
+    try:
+        ensure_models_loaded()
+        for size in (1, 64):
+            columns = sample_input_columns(size)
+            if DAILY_MODEL is not None:
+                predict_daily_columns(columns)
+            if HOURLY_MODEL is not None:
+                predict_hourly_columns(columns)
+
+        _WARM_UP_ERROR = None
+        _MODELS_READY.set()
+        logger.info("Models warmed up")
+
+    except Exception as e:
+        _WARM_UP_ERROR = str(e)
+        logger.exception("Model warm-up failed: %s", e)
+
+def start_warm_up():
+    """Warm the models up in a background thread"""
+    thread = threading.Thread(target=warm_up, name='model-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+def models_ready():
+    """True once the models are loaded and warmed up"""
+    return _MODELS_READY.is_set()
+
+def model_status():
+    """Readiness details for health checks"""
+    return {
+        "loaded": _MODELS_LOADED.is_set(),
+        "ready": _MODELS_READY.is_set(),
+        "daily_model": DAILY_MODEL is not None,
+        "hourly_model": HOURLY_MODEL is not None,
+        "versions": {model_type: MODEL_REGISTRY.current(model_type).version
+                     for model_type in MODEL_TYPES
+                     if MODEL_REGISTRY.current(model_type)},
+        "error": _WARM_UP_ERROR,
+        "lookup_tables": lookup_table_status(),
+    }
+
+def lookup_table_status():
+    """Grid, size and error bound of the lookup tables in use"""
+    return {
+        "enabled": Config.LOOKUP_TABLE_ENABLED,
+        "tables": {model_type: table.describe() if table else None
+                   for model_type, (_, table) in _LOOKUP_TABLES.items()},
+    }
+
+def _lookup_table(model_type, version):
+    """Lookup table built from this model version, or None"""
+    entry = _LOOKUP_TABLES.get(model_type)
+    if entry is not None and entry[0] == version.version:
+        return entry[1]
+
+    table = None
+    path, meta_path = table_paths(model_type)
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        logger.warning("No %s lookup table at %s, using exact inference", model_type, path)
+    else:
+        try:
+            table = LookupTable.load(path, meta_path, INPUT_DEFAULTS)
+            if table.checksum != version.checksum:
+                logger.warning("%s lookup table was built from a different model file, "
+                               "using exact inference (rebuild with python -m models.lookup_table)",
+                               model_type.capitalize())
+                table = None
+            else:
+                logger.info("%s lookup table loaded: %s (p99 error %s)",
+                            model_type.capitalize(), path, table.meta['error']['p99_abs'])
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning("Could not load %s lookup table: %s", model_type, e)
+
+    _LOOKUP_TABLES[model_type] = (version.version, table)
+    return table
+
+def _lookup_prediction(model_type, version, features_dict):
+    """Interpolated prediction with weather penalty, or None to use the model"""
+    table = _lookup_table(model_type, version)
+    if table is None:
+        return None
+
+    with timed('lookup_table'):
+        day = _day_from_date(features_dict['date']) if 'date' in features_dict else 15
+        raw = table.lookup(features_dict, day)
+    if raw is None:
+        return None
+
+    try:
+        weathersit = int(features_dict['weathersit'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(0, raw * WEATHER_PENALTY.get(weathersit, 1.0))
+
+def _batcher(model_type):
+    """Shared MicroBatcher for 'daily' or 'hourly' single predictions"""
+    batcher = _BATCHERS.get(model_type)
+    if batcher is None:
+        with _LOAD_LOCK:
+            batcher = _BATCHERS.get(model_type)
+            if batcher is None:
+                # Rows are keyed by the ModelVersion their request pinned
+                batcher = MicroBatcher(lambda features, version: _serving_model(version).predict(features),
+                                       max_batch_size=Config.MICRO_BATCH_MAX_SIZE,
+                                       window_ms=Config.MICRO_BATCH_WINDOW_MS,
+                                       name=f'{model_type}-batcher')
+                _BATCHERS[model_type] = batcher
+    return batcher
+
+def batcher_stats():
+    """Batch-size and queue-wait metrics per model"""
+    return {
+        "enabled": Config.MICRO_BATCH_ENABLED,
+        "batchers": {model_type: batcher.stats() for model_type, batcher in _BATCHERS.items()},
+    }
+
+def _predict_single(version, model, features):
+    """Raw prediction for one engineered row by `version`, micro-batched when enabled"""
+    if Config.MICRO_BATCH_ENABLED:
+        return _batcher(version.model_type).predict(features[0], version)
+    return model.predict(features)[0]
+
+def _model_version(model_type):
+    """Live ModelVersion; callers keep this reference for the whole request"""
+    ensure_models_loaded()
+    version = MODEL_REGISTRY.current(model_type)
+    if version is None:
+        raise RuntimeError(f"{model_type.capitalize()} model not loaded")
+    return version
+
+def _inference_pool():
+    """
+    Worker pool forked from the live model versions. A reload makes the
+    pool stale: a new one is forked and the old one closes once idle.
+    """
+    global _INFERENCE_POOL
+
+    versions = {model_type: MODEL_REGISTRY.current(model_type) for model_type in MODEL_TYPES}
+    pool = _INFERENCE_POOL
+    if pool is not None and pool.tag == versions:
+        return pool
+
+    with _POOL_LOCK:
+        pool = _INFERENCE_POOL
+        if pool is None or pool.tag != versions:
+            new_pool = InferencePool(
+                {model_type: version.model for model_type, version in versions.items() if version},
+                workers=Config.INFERENCE_WORKERS or None,
+                max_rows=Config.INFERENCE_POOL_MAX_ROWS,
+                tag=versions,
+            )
+            logger.info("Inference pool started (%d worker processes)", new_pool.size)
+            if pool is not None:
+                pool.close_in_background()
+            _INFERENCE_POOL = pool = new_pool
+    return pool
+
+def _serving_model(version):
+    """Object to call predict on: the model, or its process-pool proxy"""
+    if Config.INFERENCE_BACKEND == 'process':
+        return _inference_pool().model(version.model_type)
+    return version.model
+
+def _daily_model():
+    return _serving_model(_model_version('daily'))
+
+def _hourly_model():
+    return _serving_model(_model_version('hourly'))
 
 def engineer_daily_features(features_dict):
     """
@@ -206,48 +514,359 @@ def engineer_hourly_features(features_dict):
         yr,                             # 23
     ]])
 
-def predict_daily(features_dict):
-    """Make daily prediction"""
-    if DAILY_MODEL is None:
-        raise RuntimeError("Daily model not loaded")
+# ---------------------------------------------------------------------------
+# Columnar feature engineering
+#
+# Same features as engineer_daily_features / engineer_hourly_features, but
+# built from column arrays with NumPy ops so multi-row paths never loop in
+# Python per row. Values are bit-identical to the scalar functions.
+# ---------------------------------------------------------------------------
+
+DAILY_FEATURE_NAMES = [
+    'atemp', 'day_sin', 'holiday', 'hum', 'humidity_windspeed', 'is_weekend',
+    'mnth_cos', 'mnth_sin', 'season_4', 'temp', 'temp_comfort', 'temp_humidity',
+    'temp_squared', 'weather_temp_interaction', 'weekday_cos', 'weekday_sin',
+    'windspeed', 'workingday', 'yr',
+]
+
+HOURLY_FEATURE_NAMES = [
+    'atemp', 'day_sin', 'holiday', 'hr_cos', 'hr_sin', 'hum', 'humidity_windspeed',
+    'is_peak_hour', 'is_weekend', 'mnth_cos', 'mnth_sin', 'season_4', 'temp',
+    'temp_comfort', 'temp_humidity', 'temp_squared', 'time_of_day_evening',
+    'time_of_day_morning', 'weathersit_3', 'weekday_cos', 'weekday_sin',
+    'windspeed', 'workingday', 'yr',
+]
+
+# Raw model inputs and the defaults used when a record omits them
+DAILY_INPUT_FIELDS = ['yr', 'holiday', 'temp', 'atemp', 'hum', 'windspeed', 'season',
+                      'mnth', 'weekday', 'workingday', 'weathersit']
+HOURLY_INPUT_FIELDS = DAILY_INPUT_FIELDS + ['hr']
+INPUT_DEFAULTS = {'yr': 1, 'holiday': 0, 'hr': 12}
+
+def records_to_columns(records, fields=HOURLY_INPUT_FIELDS):
+    """Convert a list of feature dicts into column lists (one pass per field)"""
+    columns = {}
+    for field in fields:
+        if field in INPUT_DEFAULTS:
+            default = INPUT_DEFAULTS[field]
+            columns[field] = [r.get(field, default) for r in records]
+        else:
+            columns[field] = [r[field] for r in records]
+
+    columns['date'] = [r.get('date') for r in records]
+    return columns
+
+def _column_length(columns):
+    """Row count of a column mapping; scalars broadcast to it"""
+    lengths = {np.size(v) for v in columns.values() if np.ndim(v) > 0}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have mismatched lengths: {sorted(lengths)}")
+    return lengths.pop() if lengths else 1
+
+def _float_column(columns, name, n):
+    values = columns.get(name, INPUT_DEFAULTS.get(name))
+    if values is None:
+        raise KeyError(name)
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (n,))
+
+def _has_strings(values):
+    if isinstance(values, (str, bytes)):
+        return True
+    if isinstance(values, np.ndarray):
+        return values.dtype.kind in 'US' or (
+            values.dtype.kind == 'O' and any(isinstance(v, (str, bytes)) for v in values.flat))
+    return np.ndim(values) > 0 and any(isinstance(v, (str, bytes)) for v in values)
+
+def _int_column(columns, name, n):
+    """Column truncated towards zero, like int() on each value"""
+    values = columns.get(name)
+    if values is not None and _has_strings(values):
+        # int() itself, so strings such as '4.0' are rejected as per record
+        values = int(values) if np.ndim(values) == 0 else \
+            [int(v) for v in np.asarray(values, dtype=object).flat]
+        columns = {name: values}
+    values = _float_column(columns, name, n)
+    if not np.isfinite(values).all():
+        raise ValueError(f"{name} must be finite")
+    return np.trunc(values)
+
+def _cyclic(values, period, func):
+    """
+    func(2*pi*value/period) for an integer column. Evaluated once per distinct
+    value with the scalar expression and gathered, so results match the
+    scalar feature functions exactly and cost O(n).
+    """
+    if values.size == 0:
+        return np.empty(0)
+
+    low, high = int(values.min()), int(values.max())
+    if high - low <= 4096:
+        table = np.array([func(2 * np.pi * v / period) for v in range(low, high + 1)])
+        return table[values.astype(np.int64) - low]
+
+    unique, inverse = np.unique(values.astype(np.int64), return_inverse=True)
+    table = np.array([func(2 * np.pi * v / period) for v in unique.tolist()])
+    return table[inverse.reshape(-1)]
+
+def _day_from_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').day
+    except:
+        return 15
+
+def _day_column(columns, n):
+    """Day of month from 'day' or 'date' (15 when missing/unparseable)"""
+    if 'day' in columns:
+        return _int_column(columns, 'day', n)
+
+    dates = columns.get('date')
+    if dates is None:
+        return np.full(n, 15.0)
+
+    dates = np.broadcast_to(np.asarray(dates), (n,))
+    # Fast path: every value is a plain YYYY-MM-DD string
+    if dates.dtype.kind == 'U' and (np.char.str_len(dates) == 10).all():
+        try:
+            days = dates.astype('datetime64[D]')
+            return (days - days.astype('datetime64[M]')).astype(np.float64) + 1
+        except ValueError:
+            pass
+
+    return np.array([_day_from_date(d) for d in dates.tolist()], dtype=np.float64)
+
+def _base_feature_columns(columns, n):
+    """Features shared by the daily and hourly models"""
+    temp = _float_column(columns, 'temp', n)
+    atemp = _float_column(columns, 'atemp', n)
+    hum = _float_column(columns, 'hum', n)
+    windspeed = _float_column(columns, 'windspeed', n)
+    weekday = _int_column(columns, 'weekday', n)
+    mnth = _int_column(columns, 'mnth', n)
+
+    return {
+        'atemp': atemp,
+        'day_sin': _cyclic(_day_column(columns, n), 31, np.sin),
+        'holiday': _int_column(columns, 'holiday', n),
+        'hum': hum,
+        'humidity_windspeed': hum * windspeed,
+        'is_weekend': np.isin(weekday, (0, 6)).astype(np.float64),
+        'mnth_cos': _cyclic(mnth, 12, np.cos),
+        'mnth_sin': _cyclic(mnth, 12, np.sin),
+        'season_4': (_int_column(columns, 'season', n) == 4).astype(np.float64),
+        'temp': temp,
+        'temp_comfort': temp * atemp,
+        'temp_humidity': temp * hum,
+        # float_power matches Python's float ** 2 bit for bit; ** 2 does not
+        'temp_squared': np.float_power(temp, 2),
+        'weekday_cos': _cyclic(weekday, 7, np.cos),
+        'weekday_sin': _cyclic(weekday, 7, np.sin),
+        'windspeed': windspeed,
+        'workingday': _int_column(columns, 'workingday', n),
+        'yr': _int_column(columns, 'yr', n),
+    }
+
+def _stack(features, names, n):
+    # Column-major so each feature is one contiguous write
+    matrix = np.empty((n, len(names)), order='F')
+    for j, name in enumerate(names):
+        matrix[:, j] = features[name]
+    return matrix
+
+def daily_feature_matrix(columns):
+    """
+    Build the (n, 19) daily feature matrix from column arrays.
+    columns maps input field -> array or scalar (scalars broadcast); 'day'
+    may be given instead of 'date'.
+    """
+    n = _column_length(columns)
+    features = _base_feature_columns(columns, n)
+    weathersit = _int_column(columns, 'weathersit', n)
+    features['weather_temp_interaction'] = weathersit * features['temp']
+    return _stack(features, DAILY_FEATURE_NAMES, n)
+
+def hourly_feature_matrix(columns):
+    """Build the (n, 24) hourly feature matrix from column arrays"""
+    n = _column_length(columns)
+    features = _base_feature_columns(columns, n)
+    hr = _int_column(columns, 'hr', n)
+    weathersit = _int_column(columns, 'weathersit', n)
+
+    features.update({
+        'hr_cos': _cyclic(hr, 24, np.cos),
+        'hr_sin': _cyclic(hr, 24, np.sin),
+        'is_peak_hour': np.isin(hr, (7, 8, 9, 17, 18, 19)).astype(np.float64),
+        'time_of_day_evening': ((hr >= 18) & (hr < 24)).astype(np.float64),
+        'time_of_day_morning': ((hr >= 6) & (hr < 12)).astype(np.float64),
+        'weathersit_3': (weathersit == 3).astype(np.float64),
+    })
+    return _stack(features, HOURLY_FEATURE_NAMES, n)
+
+# Demand multiplier applied on top of the raw model output
+WEATHER_PENALTY = {1: 1.0, 2: 0.85, 3: 0.50, 4: 0.25}
+
+def apply_weather_penalty(predictions, weathersit):
+    """Vectorized weather penalty for an array of raw predictions"""
+    weathersit = np.trunc(np.asarray(weathersit, dtype=np.float64))
+    penalty = np.ones(len(weathersit))
+    for code, factor in WEATHER_PENALTY.items():
+        penalty[weathersit == code] = factor
+
+    result = np.asarray(predictions, dtype=np.float64) * penalty
+    return np.maximum(0, result)
+
+def _predict_records(model, build_matrix, engineer, fields, records):
+    """
+    Score a list of feature dicts with a single model call.
+    Returns (predictions, errors) where predictions maps record index to
+    value and errors maps record index to the reason it was skipped.
+    """
+    errors = {}
+    try:
+        with timed('feature_engineering'):
+            columns = records_to_columns(records, fields)
+            matrix = build_matrix(columns)
+        indices = list(range(len(records)))
+    except (KeyError, TypeError, ValueError):
+        # Find the offending records, then build the matrix from the rest
+        indices = []
+        for i, features_dict in enumerate(records):
+            try:
+                engineer(features_dict)
+                indices.append(i)
+            except KeyError as e:
+                errors[i] = f"Missing field: {e.args[0]}"
+            except (TypeError, ValueError) as e:
+                errors[i] = f"Invalid value: {str(e)}"
+
+        if not indices:
+            return {}, errors
+
+        with timed('feature_engineering'):
+            columns = records_to_columns([records[i] for i in indices], fields)
+            matrix = build_matrix(columns)
+
+    with timed('model_predict'):
+        raw = model.predict(matrix)
+    values = apply_weather_penalty(raw, columns['weathersit'])
+    return dict(zip(indices, values.tolist())), errors
+
+def predict_daily_batch(records):
+    """Make daily predictions for many records with one model call"""
+    return _predict_records(_daily_model(), daily_feature_matrix, engineer_daily_features,
+                            DAILY_INPUT_FIELDS, records)
+
+def predict_hourly_batch(records):
+    """Make hourly predictions for many records with one model call"""
+    return _predict_records(_hourly_model(), hourly_feature_matrix, engineer_hourly_features,
+                            HOURLY_INPUT_FIELDS, records)
+
+def predict_daily_columns(columns):
+    """Daily predictions for column arrays (see daily_feature_matrix)"""
+    model = _daily_model()
+    with timed('feature_engineering'):
+        matrix = daily_feature_matrix(columns)
+    with timed('model_predict'):
+        raw = model.predict(matrix)
+    n = len(raw)
+    return apply_weather_penalty(raw, _int_column(columns, 'weathersit', n))
+
+def predict_hourly_columns(columns):
+    """Hourly predictions for column arrays (see hourly_feature_matrix)"""
+    model = _hourly_model()
+    with timed('feature_engineering'):
+        matrix = hourly_feature_matrix(columns)
+    with timed('model_predict'):
+        raw = model.predict(matrix)
+    n = len(raw)
+    return apply_weather_penalty(raw, _int_column(columns, 'weathersit', n))
+
+def _cache_key(model_type, features_dict, fields):
+    """
+    Cache key for a single prediction (None when caching is off).
+    model_type carries the model version so a result computed by an old
+    model can never be served after a reload.
+    """
+    if not PREDICTION_CACHE.enabled:
+        return None
+
+    day = _day_from_date(features_dict['date']) if 'date' in features_dict else 15
+    int_fields = [f for f in fields if f not in ('temp', 'atemp', 'hum', 'windspeed')]
+    return PREDICTION_CACHE.make_key(model_type, features_dict, int_fields,
+                                     ['temp', 'atemp', 'hum', 'windspeed'], day,
+                                     INPUT_DEFAULTS)
+
+def predict_daily(features_dict, exact=False):
+    """Make daily prediction (from the lookup table when enabled, unless exact)"""
+    version = _model_version('daily')
+    if Config.LOOKUP_TABLE_ENABLED and not exact:
+        result = _lookup_prediction('daily', version, features_dict)
+        if result is not None:
+            return result
+
+    model = _serving_model(version)
 
     try:
-        features = engineer_daily_features(features_dict)
-        prediction = DAILY_MODEL.predict(features)[0]
+        key = _cache_key(('daily', version.version), features_dict, DAILY_INPUT_FIELDS)
+        if key is not None:
+            cached = PREDICTION_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        with timed('feature_engineering'):
+            features = engineer_daily_features(features_dict)
+        with timed('model_predict'):
+            prediction = _predict_single(version, model, features)
 
         # Apply weather penalty
         weathersit = int(features_dict['weathersit'])
-        weather_penalty = {1: 1.0, 2: 0.85, 3: 0.50, 4: 0.25}
-        penalty = weather_penalty.get(weathersit, 1.0)
+        penalty = WEATHER_PENALTY.get(weathersit, 1.0)
         result = prediction * penalty
         result = max(0, float(result))
 
-        print(f"Daily prediction: {int(result)} bikes (weather penalty: {penalty}x)")
+        if key is not None:
+            PREDICTION_CACHE.put(key, result)
+
+        logger.debug("Daily prediction: %d bikes (weather penalty: %sx)", int(result), penalty)
         return result
 
     except Exception as e:
-        print(f"Daily prediction error: {str(e)}")
+        logger.debug("Daily prediction error: %s", e)
         raise
 
-def predict_hourly(features_dict):
-    """Make hourly prediction"""
-    if HOURLY_MODEL is None:
-        raise RuntimeError("Hourly model not loaded")
+def predict_hourly(features_dict, exact=False):
+    """Make hourly prediction (from the lookup table when enabled, unless exact)"""
+    version = _model_version('hourly')
+    if Config.LOOKUP_TABLE_ENABLED and not exact:
+        result = _lookup_prediction('hourly', version, features_dict)
+        if result is not None:
+            return result
+
+    model = _serving_model(version)
 
     try:
-        features = engineer_hourly_features(features_dict)
-        prediction = HOURLY_MODEL.predict(features)[0]
+        key = _cache_key(('hourly', version.version), features_dict, HOURLY_INPUT_FIELDS)
+        if key is not None:
+            cached = PREDICTION_CACHE.get(key)
+            if cached is not None:
+                return cached
+
+        with timed('feature_engineering'):
+            features = engineer_hourly_features(features_dict)
+        with timed('model_predict'):
+            prediction = _predict_single(version, model, features)
 
         # Apply weather penalty
         weathersit = int(features_dict['weathersit'])
-        weather_penalty = {1: 1.0, 2: 0.85, 3: 0.50, 4: 0.25}
-        penalty = weather_penalty.get(weathersit, 1.0)
+        penalty = WEATHER_PENALTY.get(weathersit, 1.0)
         result = prediction * penalty
         result = max(0, float(result))
 
-        print(f"Hourly prediction: {int(result)} bikes (weather penalty: {penalty}x)")
+        if key is not None:
+            PREDICTION_CACHE.put(key, result)
+
+        logger.debug("Hourly prediction: %d bikes (weather penalty: %sx)", int(result), penalty)
         return result
 
     except Exception as e:
-        print(f"Hourly prediction error: {str(e)}")
-        raise
\ No newline at end of file
+        logger.debug("Hourly prediction error: %s", e)
+        raise
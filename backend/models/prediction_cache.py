@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache for single predictions with optional TTL.
+
+    Keys are canonical tuples of the model inputs (see make_key), so
+    requests that engineer to the same features share one entry. Call
+    clear() whenever a model is (re)loaded.
+    """
+
+    def __init__(self, maxsize=4096, ttl=0, decimals=6):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.decimals = decimals
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def make_key(self, model_type, features_dict, int_fields, float_fields, day, defaults=None):
+        """Canonical key: ints as the models see them, floats rounded"""
+        defaults = defaults or {}
+
+        def value(field):
+            return features_dict[field] if field in features_dict else defaults[field]
+
+        return (
+            model_type,
+            day,
+            tuple(int(value(f)) for f in int_fields),
+            tuple(round(float(value(f)), self.decimals) for f in float_fields),
+        )
+
+    def get(self, key):
+        """Return the cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (e.g. after a model reload)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def memory_bytes(self):
+        """Approximate memory held by keys and values"""
+        with self._lock:
+            entries = list(self._entries.items())
+
+        total = sys.getsizeof(self._entries)
+        for key, entry in entries:
+            total += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+            total += sum(sys.getsizeof(part) for part in key[2:])
+        return total
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+            lookups = self.hits + self.misses
+            stats = {
+                "enabled": self.enabled,
+                "size": size,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+        stats["memory_bytes"] = self.memory_bytes()
+        return stats
@@ -0,0 +1,239 @@
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _worker_main(models, conn, input_name, output_name, max_rows, max_features):
+    """Child loop: read a matrix from shared memory, predict, write results back"""
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    inputs = np.ndarray((max_rows * max_features,), dtype=np.float32, buffer=input_shm.buf)
+    outputs = np.ndarray((max_rows,), dtype=np.float32, buffer=output_shm.buf)
+
+    # One thread per process: parallelism comes from the pool
+    for model in models.values():
+        model = getattr(model, 'fallback', None) or model  # numpy engine: its booster
+        if hasattr(model, 'get_booster'):
+            model.get_booster().set_param({'nthread': 1})
+        elif hasattr(model, 'booster') and hasattr(model.booster, 'set_param'):
+            model.booster.set_param({'nthread': 1})
+
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+
+            model_type, n_rows, n_features = task
+            try:
+                features = inputs[:n_rows * n_features].reshape(n_rows, n_features)
+                outputs[:n_rows] = models[model_type].predict(features)
+                conn.send(None)
+            except Exception as e:
+                conn.send(str(e))
+    finally:
+        del inputs, outputs
+        input_shm.close()
+        output_shm.close()
+        conn.close()
+
+
+# A worker whose pipe raises one of these has died (e.g. OOM-killed)
+WORKER_LOST_ERRORS = (EOFError, OSError)
+
+# How often a caller waiting for a busy pool checks whether it was closed
+IDLE_POLL_SECONDS = 0.1
+
+
+class PoolClosed(RuntimeError):
+    """The pool was closed before it could run the prediction"""
+
+
+class _Worker:
+    def __init__(self, context, models, max_rows, max_features):
+        self.closed = False
+        self.input_shm = shared_memory.SharedMemory(create=True, size=max_rows * max_features * 4)
+        self.output_shm = shared_memory.SharedMemory(create=True, size=max_rows * 4)
+        self.inputs = np.ndarray((max_rows * max_features,), dtype=np.float32, buffer=self.input_shm.buf)
+        self.outputs = np.ndarray((max_rows,), dtype=np.float32, buffer=self.output_shm.buf)
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(models, child_conn, self.input_shm.name, self.output_shm.name, max_rows, max_features),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def predict(self, model_type, features):
+        n_rows, n_features = features.shape
+        self.inputs[:n_rows * n_features] = features.reshape(-1)
+        self.conn.send((model_type, n_rows, n_features))
+        error = self.conn.recv()
+        if error is not None:
+            raise RuntimeError(f"Inference worker error: {error}")
+        return self.outputs[:n_rows].copy()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except (BrokenPipeError, OSError):
+            pass
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        del self.inputs, self.outputs
+        for shm in (self.input_shm, self.output_shm):
+            shm.close()
+            shm.unlink()
+
+
+class PooledModel:
+    """Stands in for a model; predict() runs in the pool's worker processes"""
+
+    def __init__(self, pool, model_type, model):
+        self.pool = pool
+        self.model_type = model_type
+        self.model = model
+        self.n_features_in_ = getattr(model, 'n_features_in_', None)
+
+    def predict(self, features):
+        try:
+            return self.pool.predict(self.model_type, features)
+        except PoolClosed:
+            # Pool retired after a model reload; finish in-process
+            return self.model.predict(features)
+
+
+class InferencePool:
+    """
+    Pool of forked worker processes sharing one copy of the models.
+
+    The models are already loaded when the workers fork, so their memory
+    is shared copy-on-write instead of being loaded per process. Each
+    worker owns a pair of shared-memory buffers. Feature matrices are
+    copied into the input buffer as float32, and predictions come back
+    through the output buffer. Only a small (model, rows, cols) tuple
+    goes over the pipe. Matrices larger than max_rows are split. tag is
+    any value the owner uses to tell pools apart (e.g. model versions).
+    """
+
+    def __init__(self, models, workers=None, max_rows=65536, tag=None):
+        self.models = dict(models)
+        self.tag = tag
+        self.max_rows = max_rows
+        self.max_features = max(getattr(m, 'n_features_in_', 0) for m in self.models.values())
+        self.size = workers or os.cpu_count() or 1
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context('fork')
+        self.respawned = 0
+        self.closed = False
+
+        for _ in range(self.size):
+            worker = _Worker(self._context, self.models, max_rows, self.max_features)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        atexit.register(self.close)
+
+    def model(self, model_type):
+        return PooledModel(self, model_type, self.models[model_type])
+
+    def predict(self, model_type, features):
+        if self.closed:
+            raise PoolClosed("Inference pool is closed")
+
+        features = np.asarray(features, dtype=np.float32)
+        if len(features) == 0:
+            return np.empty(0, dtype=np.float32)
+
+        worker = self._acquire()
+        try:
+            try:
+                return self._predict_with(worker, model_type, features)
+            except WORKER_LOST_ERRORS:
+                # The worker died: replace it and retry once on the new one
+                worker = self._respawn(worker)
+                return self._predict_with(worker, model_type, features)
+        except WORKER_LOST_ERRORS:
+            worker = self._respawn(worker)
+            raise
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+    def _acquire(self):
+        """Wait for an idle worker; raises PoolClosed once the pool is closed"""
+        while True:
+            try:
+                worker = self._idle.get(timeout=IDLE_POLL_SECONDS)
+            except queue.Empty:
+                if self.closed:
+                    raise PoolClosed("Inference pool is closed")
+                continue
+            if self.closed:
+                # close() is waiting to collect this worker
+                self._idle.put(worker)
+                raise PoolClosed("Inference pool is closed")
+            return worker
+
+    def _predict_with(self, worker, model_type, features):
+        if worker is None:
+            raise PoolClosed("Inference pool is closed")
+        chunks = [worker.predict(model_type, features[start:start + self.max_rows])
+                  for start in range(0, len(features), self.max_rows)]
+        return np.concatenate(chunks)
+
+    def _respawn(self, worker):
+        """Close a dead worker and fork its replacement (None once the pool is closed)"""
+        worker.close()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self.closed:
+                return None
+            replacement = _Worker(self._context, self.models, self.max_rows, self.max_features)
+            self._workers.append(replacement)
+            self.respawned += 1
+        return replacement
+
+    def close(self, timeout=30.0):
+        """
+        Stop the workers once in-flight predictions have returned them;
+        after timeout seconds the rest are stopped regardless
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            expected = len(self._workers)
+        for _ in range(expected):
+            try:
+                self._idle.get(timeout=max(0.0, deadline - time.monotonic())).close()
+            except queue.Empty:
+                break
+
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.close()
+
+    def close_in_background(self):
+        thread = threading.Thread(target=self.close, name='inference-pool-close', daemon=True)
+        thread.start()
+        return thread
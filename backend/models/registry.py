@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelVersion:
+    """One loaded model plus the metadata needed to tell versions apart"""
+
+    def __init__(self, model_type, version, model, path, checksum, mtime, load_seconds):
+        self.model_type = model_type
+        self.version = version
+        self.model = model
+        self.path = path
+        self.checksum = checksum
+        self.mtime = mtime
+        self.load_seconds = load_seconds
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self.n_features = getattr(model, 'n_features_in_', None)
+        self.engine = getattr(model, 'name', 'sklearn')
+
+    def to_dict(self):
+        return {
+            "model_type": self.model_type,
+            "version": self.version,
+            "path": self.path,
+            "checksum": self.checksum,
+            "n_features": self.n_features,
+            "engine": self.engine,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+        }
+
+
+class ModelRegistry:
+    """
+    Tracks the live version of each model and swaps in new ones.
+
+    resolve(model_type) returns the file to load (None if there is none)
+    and loader(model_type, path) builds the model from it. A new version
+    is built completely before the live reference is replaced, so
+    requests that already hold the old model finish on it.
+    on_swap(model_type, version) is called after every swap, under the
+    load lock.
+    """
+
+    def __init__(self, model_types, resolve, loader, on_swap=None, history_size=10):
+        self.model_types = tuple(model_types)
+        self.resolve = resolve
+        self.loader = loader
+        self.on_swap = on_swap
+        self.history_size = history_size
+        self._current = {}
+        self._history = {model_type: [] for model_type in self.model_types}
+        self._next_version = {model_type: 1 for model_type in self.model_types}
+        self._load_lock = threading.Lock()
+        self._watcher = None
+
+    def current(self, model_type):
+        """Live ModelVersion for a model type (None if not loaded)"""
+        return self._current.get(model_type)
+
+    def load(self, model_type, force=True):
+        """
+        Load a model type and make it live. Without force, a file whose
+        checksum matches the live version is not loaded again.
+        """
+        with self._load_lock:
+            path = self.resolve(model_type)
+            if path is None:
+                return None
+
+            checksum = file_checksum(path)
+            live = self._current.get(model_type)
+            if not force and live and live.checksum == checksum and live.path == path:
+                return live
+
+            started = time.perf_counter()
+            model = self.loader(model_type, path)
+            version = ModelVersion(model_type, self._next_version[model_type], model, path,
+                                   checksum, os.path.getmtime(path),
+                                   time.perf_counter() - started)
+            self._next_version[model_type] += 1
+
+            # Atomic reference swap; in-flight requests keep the old model
+            self._current[model_type] = version
+            history = self._history[model_type]
+            history.append(version.to_dict())
+            del history[:-self.history_size]
+
+            # Under the lock, so overlapping loads install in version order
+            if self.on_swap:
+                self.on_swap(model_type, version)
+        return version
+
+    def load_all(self, force=True):
+        return {model_type: self.load(model_type, force) for model_type in self.model_types}
+
+    def reload_in_background(self, model_types=None):
+        """Reload in a daemon thread; serving continues on the live versions"""
+        model_types = model_types or list(self.model_types)
+
+        def run():
+            for model_type in model_types:
+                try:
+                    self.load(model_type)
+                except Exception as e:
+                    logger.exception("Reload of %s model failed: %s", model_type, e)
+
+        thread = threading.Thread(target=run, name='model-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def start_watcher(self, watch_paths, interval):
+        """
+        Poll the files returned by watch_paths(model_type) every interval
+        seconds and reload a model type when any of them changes.
+        """
+        if self._watcher is not None:
+            return self._watcher
+
+        def mtimes(model_type):
+            return {path: os.path.getmtime(path) for path in watch_paths(model_type)
+                    if os.path.exists(path)}
+
+        seen = {model_type: mtimes(model_type) for model_type in self.model_types}
+
+        def run():
+            while True:
+                time.sleep(interval)
+                for model_type in self.model_types:
+                    try:
+                        latest = mtimes(model_type)
+                        if latest != seen[model_type]:
+                            seen[model_type] = latest
+                            version = self.load(model_type, force=False)
+                            if version:
+                                logger.info("%s model is now version %s (%s)", model_type, version.version, version.path)
+                    except Exception as e:
+                        logger.exception("Model watcher error (%s): %s", model_type, e)
+
+        self._watcher = threading.Thread(target=run, name='model-watcher', daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def describe(self):
+        """Live version and load history for every model type"""
+        result = {}
+        for model_type in self.model_types:
+            live = self._current.get(model_type)
+            result[model_type] = {
+                "current": live.to_dict() if live else None,
+                "history": list(self._history[model_type]),
+            }
+        return result
@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify
+from functools import wraps
+from hmac import compare_digest
+from models.ml_model import MODEL_REGISTRY, MODEL_TYPES, reload_models
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+
+def admin_required(view):
+    """Allow the request only with a matching X-Admin-Token header"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method == 'OPTIONS':
+            return '', 200
+
+        if not Config.ADMIN_TOKEN:
+            return jsonify({"error": "Admin endpoints are disabled"}), 403
+
+        token = request.headers.get('X-Admin-Token', '')
+        if not compare_digest(token, Config.ADMIN_TOKEN):
+            return jsonify({"error": "Invalid admin token"}), 401
+
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/models', methods=['GET', 'OPTIONS'])
+@admin_required
+def list_models():
+    """Live model versions and load history"""
+    return jsonify({"success": True, "models": MODEL_REGISTRY.describe()}), 200
+
+
+@admin_bp.route('/models/reload', methods=['POST', 'OPTIONS'])
+@admin_required
+def reload_models_route():
+    """Load new model versions and swap them in without a restart"""
+    try:
+        data = request.get_json(silent=True) or {}
+        model = data.get('model', 'all')
+
+        if model == 'all':
+            model_types = list(MODEL_TYPES)
+        elif model in MODEL_TYPES:
+            model_types = [model]
+        else:
+            return jsonify({"error": f"Unknown model: {model}"}), 400
+
+        if data.get('background'):
+            reload_models(model_types, background=True)
+            return jsonify({"success": True, "message": "Reload started", "models": model_types}), 202
+
+        versions = reload_models(model_types)
+        return jsonify({
+            "success": True,
+            "models": {model_type: version.to_dict() if version else None
+                       for model_type, version in versions.items()}
+        }), 200
+
+    except Exception as e:
+        logger.exception("Model reload error: %s", e)
+        return jsonify({"error": str(e)}), 500
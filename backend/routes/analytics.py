@@ -5,6 +5,9 @@ from config import Config
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# predictions.weathersit codes
+WEATHER_LABELS = {1: 'Clear', 2: 'Cloudy', 3: 'Rainy', 4: 'Stormy'}
+
 def get_user_id():
     auth = request.headers.get('Authorization')
     if not auth or not auth.startswith('Bearer '):
@@ -28,18 +31,14 @@ def weather_impact():
 
     cursor.execute("""
         SELECT
-            CASE
-                WHEN input_data LIKE '%weathersit%1%' THEN 'Clear'
-                WHEN input_data LIKE '%weathersit%2%' THEN 'Cloudy'
-                WHEN input_data LIKE '%weathersit%3%' THEN 'Rainy'
-                WHEN input_data LIKE '%weathersit%4%' THEN 'Stormy'
-                ELSE 'Unknown'
-            END AS weather,
+            weathersit,
             AVG(prediction_value) AS avg_prediction,
             COUNT(*) AS count
         FROM predictions
         WHERE user_id = ?
-        GROUP BY weather
+          AND weathersit BETWEEN 1 AND 4
+        GROUP BY weathersit
+        ORDER BY weathersit
     """, (user_id,))
 
     rows = cursor.fetchall()
@@ -48,11 +47,11 @@ def weather_impact():
     return jsonify({
         "weather_impact": [
             {
-                "weather": r["weather"],
+                "weather": WEATHER_LABELS[r["weathersit"]],
                 "avg_prediction": round(r["avg_prediction"], 2),
                 "count": r["count"]
             }
-            for r in rows if r["weather"] != "Unknown"
+            for r in rows
         ]
     }), 200
 
@@ -67,15 +66,15 @@ def hourly_patterns():
 
     cursor.execute("""
         SELECT
-            CAST(SUBSTR(input_data, INSTR(input_data, 'hr') + 2, 2) AS INTEGER) AS hour,
+            hr AS hour,
             AVG(prediction_value) AS avg_prediction,
             COUNT(*) AS count
         FROM predictions
         WHERE user_id = ?
           AND prediction_type = 'hourly'
-          AND input_data LIKE '%hr%'
-        GROUP BY hour
-        ORDER BY hour
+          AND hr BETWEEN 0 AND 23
+        GROUP BY hr
+        ORDER BY hr
     """, (user_id,))
 
     rows = cursor.fetchall()
@@ -88,6 +87,6 @@ def hourly_patterns():
                 "avg_prediction": round(r["avg_prediction"], 2),
                 "count": r["count"]
             }
-            for r in rows if r["hour"] is not None and 0 <= r["hour"] <= 23
+            for r in rows
         ]
     }), 200
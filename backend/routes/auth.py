@@ -3,6 +3,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from datetime import timedelta
 from utils.database import get_db
+import logging
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -72,7 +75,7 @@ def register():
             expires_delta=timedelta(days=7)
         )
 
-        print(f"✅ User registered:  {username}")
+        logger.info("User registered: %s", username)
 
         return jsonify({
             "success": True,
@@ -86,9 +89,7 @@ def register():
         }), 201
 
     except Exception as e:
-        print(f"❌ Registration error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Registration error: %s", e)
         return jsonify({"error": "Registration failed.  Please try again."}), 500
 
 
@@ -128,7 +129,7 @@ def login():
             expires_delta=timedelta(days=7)
         )
 
-        print(f"✅ User logged in: {username}")
+        logger.info("User logged in: %s", username)
 
         return jsonify({
             "success": True,
@@ -142,9 +143,7 @@ def login():
         }), 200
 
     except Exception as e:
-        print(f"❌ Login error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Login error: %s", e)
         return jsonify({"error": "Login failed. Please try again."}), 500
 
 
@@ -180,5 +179,5 @@ def verify():
         }), 200
 
     except Exception as e:
-        print(f"❌ Verify error: {e}")
+        logger.exception("Verify error: %s", e)
         return jsonify({"error": "Verification failed"}), 500
\ No newline at end of file
@@ -1,8 +1,25 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from utils.database import get_db
+from utils.export import EXPORT_FORMATS, export_response
+from utils.pagination import decode_cursor, fetch_page, page_size
+import logging
+
+logger = logging.getLogger(__name__)
 
 chatbot_bp = Blueprint("chatbot", __name__)
 
+HISTORY_COLUMNS = ("message", "response", "source", "created_at")
+EXPORT_COLUMNS = ("id",) + HISTORY_COLUMNS
+
+
+def get_user_id(cursor, username):
+    user = cursor.execute(
+        "SELECT id FROM users WHERE username = ?",
+        (username,)
+    ).fetchone()
+    return user["id"] if user else None
+
 
 def generate_response(message):
     """Enhanced rule-based response system"""
@@ -45,44 +62,131 @@ def chatbot_message():
     if request.method == "OPTIONS":
         return jsonify({"status": "ok"}), 200
 
-    print("\n" + "="*50)
-    print("🔵 CHATBOT MESSAGE RECEIVED")
-    print("="*50)
-
     try:
         data = request.get_json()
-        print(f"📦 Data:  {data}")
 
         if not data:
             return jsonify({"success": False, "error": "No data provided"}), 400
 
         message = data.get("message", "").strip()
-        print(f"📩 Message: '{message}'")
+        logger.debug("Chat message received (%d chars)", len(message))
 
         if not message:
             return jsonify({"success":  False, "error": "Message cannot be empty"}), 400
 
         # Generate response
         response = generate_response(message)
-        print(f"🤖 Response: {response[: 100]}...")
 
-        print("✅ Success!")
-        print("="*50 + "\n")
+        # Signed-in users' conversations are kept for /history
+        try:
+            verify_jwt_in_request(optional=True)
+            username = get_jwt_identity()
+        except Exception as jwt_error:
+            logger.info("JWT verification failed: %s", jwt_error)
+            username = None
+
+        if username:
+            try:
+                conn = get_db()
+                cursor = conn.cursor()
+                user_id = get_user_id(cursor, username)
+                if user_id:
+                    cursor.execute(
+                        """
+                        INSERT INTO chat_history (user_id, message, response, source)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        (user_id, message, response, "text")
+                    )
+                    conn.commit()
+                conn.close()
+            except Exception as save_error:
+                logger.error("Failed to save chat: %s", save_error)
 
         return jsonify({"success": True, "response": response}), 200
 
     except Exception as e:
-        print(f"❌ ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        print("="*50 + "\n")
+        logger.exception("Chatbot message error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @chatbot_bp.route("/history", methods=["GET", "OPTIONS"])
 def chatbot_history():
+    """Signed-in user's chat history, newest first (?limit=, ?cursor= from next_cursor)"""
+    if request.method == "OPTIONS":
+        return jsonify({"status": "ok"}), 200
+
+    try:
+        try:
+            verify_jwt_in_request()
+            username = get_jwt_identity()
+        except Exception as jwt_error:
+            logger.info("JWT verification failed: %s", jwt_error)
+            return jsonify({"success": False, "error": "Authentication failed.  Please log in again."}), 401
+
+        try:
+            limit = page_size(request.args.get("limit"))
+            cursor = request.args.get("cursor") or None
+            if cursor is not None:
+                decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid limit or cursor"}), 400
+
+        conn = get_db()
+        user_id = get_user_id(conn.cursor(), username)
+        if not user_id:
+            conn.close()
+            return jsonify({"success": False, "error": "User not found"}), 404
+
+        # One page (served by idx_chat_history_user_created)
+        rows, next_cursor = fetch_page(conn, "chat_history", HISTORY_COLUMNS, user_id, limit, cursor)
+        conn.close()
+
+        history = [{column: row[column] for column in HISTORY_COLUMNS} for row in rows]
+
+        return jsonify({
+            "success": True,
+            "history": history,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }), 200
+
+    except Exception as e:
+        logger.exception("Chat history error: %s", e)
+        return jsonify({"success": False, "error": "Failed to load history"}), 500
+
+
+@chatbot_bp.route("/export", methods=["GET", "OPTIONS"])
+def chatbot_export():
+    """Stream the signed-in user's full chat history, oldest first (?format=csv|ndjson, ?gzip=true)"""
     if request.method == "OPTIONS":
         return jsonify({"status": "ok"}), 200
 
-    # Return empty history for now
-    return jsonify({"success": True, "history": []}), 200
\ No newline at end of file
+    try:
+        verify_jwt_in_request()
+        username = get_jwt_identity()
+    except Exception as jwt_error:
+        logger.info("JWT verification failed: %s", jwt_error)
+        return jsonify({"success": False, "error": "Authentication failed.  Please log in again."}), 401
+
+    output_format = request.args.get("format", "csv")
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({"success": False, "error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    conn = get_db()
+    user_id = get_user_id(conn.cursor(), username)
+    conn.close()
+    if not user_id:
+        return jsonify({"success": False, "error": "User not found"}), 404
+
+    return export_response(
+        f"""
+        SELECT {', '.join(EXPORT_COLUMNS)}
+        FROM chat_history
+        WHERE user_id = ?
+        ORDER BY created_at, id
+        """,
+        (user_id,), EXPORT_COLUMNS, output_format,
+        compress=request.args.get("gzip", "").lower() in ("1", "true"),
+        filename="chat_history"
+    )
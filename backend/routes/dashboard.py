@@ -1,24 +1,18 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from utils.database import get_db
 from datetime import datetime
+import logging
 
-dashboard_bp = Blueprint('dashboard', __name__)
-
+logger = logging.getLogger(__name__)
 
-def get_user_id(cursor, username):
-    user = cursor.execute(
-        "SELECT id FROM users WHERE username = ? ",
-        (username,)
-    ).fetchone()
-    return user["id"] if user else None
+dashboard_bp = Blueprint('dashboard', __name__)
 
 
 @dashboard_bp.route('/stats', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_dashboard_stats():
     if request.method == 'OPTIONS':
-        from flask import request
         return jsonify({"status": "ok"}), 200
 
     try:
@@ -27,46 +21,32 @@ def get_dashboard_stats():
         conn = get_db()
         cursor = conn.cursor()
 
-        user_id = get_user_id(cursor, username)
-        if not user_id:
-            conn.close()
-            return jsonify({"error": "User not found"}), 404
-
-        # Total predictions
-        total_predictions = cursor.execute(
-            'SELECT COUNT(*) as count FROM predictions WHERE user_id = ?',
-            (user_id,)
-        ).fetchone()['count']
-
-        # Daily predictions count
-        daily_count = cursor.execute(
-            'SELECT COUNT(*) as count FROM predictions WHERE user_id = ? AND prediction_type = "daily"',
-            (user_id,)
-        ).fetchone()['count']
-
-        # Hourly predictions count
-        hourly_count = cursor.execute(
-            'SELECT COUNT(*) as count FROM predictions WHERE user_id = ? AND prediction_type = "hourly"',
-            (user_id,)
-        ).fetchone()['count']
-
-        # Last prediction
-        last_prediction = cursor.execute(
-            '''SELECT prediction_value, prediction_type, created_at
-               FROM predictions
-               WHERE user_id = ?
-               ORDER BY created_at DESC
-               LIMIT 1''',
-            (user_id,)
+        # One read: the user's id and their trigger-maintained aggregates
+        stats = cursor.execute(
+            """SELECT u.id AS user_id, s.total_predictions, s.daily_predictions,
+                      s.hourly_predictions, s.last_prediction_value, s.last_prediction_type,
+                      s.last_prediction_at, s.feedback_count
+               FROM users u
+               LEFT JOIN user_stats s ON s.user_id = u.id
+               WHERE u.username = ?""",
+            (username,)
         ).fetchone()
+        conn.close()
 
-        # Feedback count
-        feedback_count = cursor.execute(
-            'SELECT COUNT(*) as count FROM feedback WHERE user_id = ?',
-            (user_id,)
-        ).fetchone()['count']
+        if not stats:
+            return jsonify({"error": "User not found"}), 404
 
-        conn.close()
+        total_predictions = stats['total_predictions'] or 0
+        daily_count = stats['daily_predictions'] or 0
+        hourly_count = stats['hourly_predictions'] or 0
+        feedback_count = stats['feedback_count'] or 0
+        last_prediction = None
+        if stats['last_prediction_at'] is not None:
+            last_prediction = {
+                'prediction_value': stats['last_prediction_value'],
+                'prediction_type': stats['last_prediction_type'],
+                'created_at': stats['last_prediction_at'],
+            }
 
         # Format last prediction
         last_pred_text = "--"
@@ -89,7 +69,5 @@ def get_dashboard_stats():
         }), 200
 
     except Exception as e:
-        print(f"❌ Dashboard stats error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Dashboard stats error: %s", e)
         return jsonify({"error": "Failed to load statistics"}), 500
\ No newline at end of file
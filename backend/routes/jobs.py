@@ -0,0 +1,240 @@
+from flask import Blueprint, request, jsonify, send_file
+from models.ml_model import MODEL_TYPES, reload_models, warm_up, model_status
+from routes.admin import admin_required
+from routes.predictions import (
+    get_user_id, bulk_output, csv_records, text_lines, predict_extracted
+)
+from services.jobs import (
+    register_job_kind, submit_job, get_job, describe_job, cancel_job, new_job_id, job_dir,
+    job_runner_stats, SUCCEEDED, FINISHED_STATUSES
+)
+from services.pdf_parser import extract_data_from_pdf
+from utils.export import EXPORT_FORMATS
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def run_bulk_job(job, context):
+    """Score an uploaded CSV into JOB_DIR/<id>/output.<format>"""
+    params = job['params']
+    input_path = params['input_path']
+    output_path = context.path(f"output.{params['format']}")
+    total = os.path.getsize(input_path) or 1
+
+    rows = 0
+    with open(input_path, 'rb') as source, open(output_path + '.tmp', 'w', newline='') as output:
+        records = csv_records(text_lines(source))
+        for rows, text in bulk_output(records, params['type'], params['format']):
+            output.write(text)
+            context.progress(source.tell() / total)
+    os.replace(output_path + '.tmp', output_path)
+
+    return {"rows": rows, "format": params['format']}, output_path
+
+
+def run_pdf_job(job, context):
+    """Extract inputs from an uploaded PDF and predict"""
+    params = job['params']
+    extracted_data = extract_data_from_pdf(params['input_path'])
+    if not extracted_data:
+        raise ValueError("Could not extract data from PDF. Please ensure the PDF contains the required fields.")
+    context.progress(0.5)
+
+    prediction = int(predict_extracted(extracted_data, params['type']))
+    return {"prediction": prediction, "type": params['type'], "extracted_data": extracted_data}, None
+
+
+def run_warm_up_job(job, context):
+    """Reload the requested models (optionally) and warm them up"""
+    params = job['params']
+    if params.get('reload'):
+        reload_models(params['models'])
+    context.progress(0.5)
+
+    warm_up()
+    status = model_status()
+    if status.get('error'):
+        raise RuntimeError(status['error'])
+    return {"models": status}, None
+
+
+register_job_kind('bulk', run_bulk_job)
+register_job_kind('pdf', run_pdf_job)
+register_job_kind('warm_up', run_warm_up_job)
+
+
+def accepted(job_id):
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}",
+        "result_url": f"/api/jobs/{job_id}/result"
+    }), 202
+
+
+def owned_job(job_id):
+    """The job, or None if it doesn't exist, has expired or belongs to another user"""
+    job = get_job(job_id)
+    if job is None:
+        return None
+    if job['user_id'] is not None and job['user_id'] != get_user_id():
+        return None
+    return job
+
+
+@jobs_bp.route('/bulk', methods=['POST', 'OPTIONS'])
+def submit_bulk_job():
+    """
+    Queue a bulk CSV scoring job. Takes the same body and ?format=/?type=
+    parameters as /api/predictions/bulk; the output is fetched from the
+    job's result endpoint once it has finished.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    default_type = request.args.get('type', 'daily')
+    if default_type not in ('daily', 'hourly'):
+        return jsonify({"error": f"Unknown type: {default_type}"}), 400
+
+    try:
+        job_id = new_job_id()
+        input_path = os.path.join(job_dir(job_id, create=True), 'input.csv')
+
+        if request.mimetype == 'multipart/form-data':
+            if 'file' not in request.files:
+                return jsonify({"error": "No file provided"}), 400
+            request.files['file'].save(input_path)
+        else:
+            with open(input_path, 'wb') as target:
+                shutil.copyfileobj(request.stream, target, 1 << 16)
+
+        submit_job('bulk', {"input_path": input_path, "format": output_format, "type": default_type},
+                   user_id=get_user_id(), job_id=job_id)
+        return accepted(job_id)
+
+    except Exception as e:
+        logger.exception("Bulk job submit error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@jobs_bp.route('/pdf', methods=['POST', 'OPTIONS'])
+def submit_pdf_job():
+    """Queue a PDF upload for extraction and prediction"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    if 'file' not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    file = request.files['file']
+    prediction_type = request.form.get('type', 'daily')
+
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+
+    if not file.filename.lower().endswith('.pdf'):
+        return jsonify({"error": "Only PDF files are allowed"}), 400
+
+    try:
+        job_id = new_job_id()
+        input_path = os.path.join(job_dir(job_id, create=True), 'input.pdf')
+        file.save(input_path)
+
+        submit_job('pdf', {"input_path": input_path, "type": prediction_type,
+                           "filename": file.filename},
+                   user_id=get_user_id(), job_id=job_id)
+        return accepted(job_id)
+
+    except Exception as e:
+        logger.exception("PDF job submit error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@jobs_bp.route('/warm-up', methods=['POST', 'OPTIONS'])
+@admin_required
+def submit_warm_up_job():
+    """Queue a model warm-up, optionally reloading the models first"""
+    data = request.get_json(silent=True) or {}
+    model = data.get('model', 'all')
+
+    if model == 'all':
+        model_types = list(MODEL_TYPES)
+    elif model in MODEL_TYPES:
+        model_types = [model]
+    else:
+        return jsonify({"error": f"Unknown model: {model}"}), 400
+
+    job_id = submit_job('warm_up', {"models": model_types, "reload": bool(data.get('reload'))})
+    return accepted(job_id)
+
+
+@jobs_bp.route('/<job_id>', methods=['GET', 'OPTIONS'])
+def job_status(job_id):
+    """Status and progress (percent) of a job"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    job = owned_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({"success": True, "job": describe_job(job)}), 200
+
+
+@jobs_bp.route('/<job_id>/result', methods=['GET', 'OPTIONS'])
+def job_result(job_id):
+    """The finished job's result: its output file, or its JSON result"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    job = owned_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job['status'] != SUCCEEDED:
+        return jsonify({"error": f"Job is {job['status']}", "job": describe_job(job)}), 409
+
+    if job['result_path']:
+        if not os.path.exists(job['result_path']):
+            return jsonify({"error": "Job result is no longer available"}), 410
+        mimetype = EXPORT_FORMATS.get(job['result'].get('format'), 'application/octet-stream')
+        return send_file(os.path.abspath(job['result_path']), mimetype=mimetype,
+                         as_attachment=True,
+                         download_name=f"{job_id}.{job['result'].get('format', 'out')}")
+
+    return jsonify({"success": True, "job_id": job_id, "result": job['result']}), 200
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST', 'OPTIONS'])
+def cancel_job_route(job_id):
+    """Cancel a queued job, or ask a running one to stop"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    job = owned_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job['status'] in FINISHED_STATUSES:
+        return jsonify({"error": f"Job is already {job['status']}", "job": describe_job(job)}), 409
+
+    job = cancel_job(job_id)
+    return jsonify({"success": True, "job": describe_job(job)}), 200
+
+
+@jobs_bp.route('/stats', methods=['GET', 'OPTIONS'])
+def job_stats():
+    """Job dispatcher stats for this worker process"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    return jsonify({"success": True, "runner": job_runner_stats()}), 200
@@ -1,13 +1,169 @@
-from flask import Blueprint, request, jsonify
-from models.ml_model import predict_daily, predict_hourly
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from models.ml_model import (
+    predict_daily, predict_hourly, predict_daily_batch, predict_hourly_batch,
+    predict_daily_columns, predict_hourly_columns, batcher_stats, PREDICTION_CACHE
+)
 from services. pdf_parser import extract_data_from_pdf
-from utils.database import get_db
+from utils.database import get_db, prediction_feature_values, PREDICTION_FEATURE_COLUMNS
+from utils.dates import date_range, derive_date_columns
+from utils.export import EXPORT_FORMATS, csv_chunk, export_response
+from utils.metrics import timed
+from utils.pagination import decode_cursor, fetch_page, page_size
+from utils.write_behind import WriteBehindWriter
+import numpy as np
 import jwt
 from config import Config
+from itertools import islice
+import atexit
+import codecs
+import csv
+import json
+import logging
 import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 predictions_bp = Blueprint('predictions', __name__)
 
+DAILY_REQUIRED_FIELDS = ['date', 'season', 'yr', 'mnth', 'weekday', 'holiday',
+                         'workingday', 'weathersit', 'temp', 'atemp', 'hum', 'windspeed']
+HOURLY_REQUIRED_FIELDS = DAILY_REQUIRED_FIELDS + ['hr']
+
+# Fields that may vary hour by hour in a demand curve request
+WEATHER_FIELDS = ['weathersit', 'temp', 'atemp', 'hum', 'windspeed']
+
+# Columns of /bulk CSV output (formats: utils.export.EXPORT_FORMATS)
+BULK_CSV_COLUMNS = ['row', 'id', 'type', 'prediction', 'error']
+
+# Saved predictions, with the typed input columns
+INSERT_PREDICTION_SQL = f'''
+    INSERT INTO predictions (user_id, prediction_type, input_data, prediction_value,
+                             {', '.join(column for column, _, _ in PREDICTION_FEATURE_COLUMNS)})
+    VALUES (?, ?, ?, ?, {', '.join('?' * len(PREDICTION_FEATURE_COLUMNS))})
+'''
+
+_PREDICTION_WRITER = None
+_WRITER_LOCK = threading.Lock()
+
+# Inputs a sweep may vary (besides 'date', the base scenario's fields)
+SWEEP_FIELDS = [field for field in HOURLY_REQUIRED_FIELDS if field != 'date']
+
+
+def get_user_id():
+    """Return the user ID from the Bearer token, or None"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    try:
+        token = auth_header.split(' ')[1]
+        with timed('jwt_decode'):
+            payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
+        return payload.get('user_id')
+    except:
+        return None
+
+
+def prediction_writer():
+    """The write-behind writer for saved predictions, started on first use"""
+    global _PREDICTION_WRITER
+    if _PREDICTION_WRITER is None:
+        with _WRITER_LOCK:
+            if _PREDICTION_WRITER is None:
+                _PREDICTION_WRITER = WriteBehindWriter(
+                    INSERT_PREDICTION_SQL,
+                    flush_rows=Config.PREDICTION_FLUSH_ROWS,
+                    flush_ms=Config.PREDICTION_FLUSH_MS,
+                    max_queue=Config.PREDICTION_QUEUE_SIZE,
+                    overflow=Config.PREDICTION_OVERFLOW,
+                    spill_path=Config.PREDICTION_SPILL_PATH,
+                    name='prediction-writer'
+                )
+                atexit.register(_PREDICTION_WRITER.close)
+    return _PREDICTION_WRITER
+
+
+def prediction_writer_stats():
+    """Write-behind counters, or None before the first saved prediction"""
+    return _PREDICTION_WRITER.stats() if _PREDICTION_WRITER is not None else None
+
+
+def save_predictions(user_id, rows):
+    """
+    Persist (prediction_type, input_data, value) rows: queued for the
+    write-behind writer, or inserted in one transaction when it is off
+    """
+    try:
+        with timed('db_write'):
+            params = [(user_id, prediction_type, str(data), int(value), *prediction_feature_values(data))
+                      for prediction_type, data, value in rows]
+            if Config.PREDICTION_WRITE_BEHIND:
+                prediction_writer().submit(params)
+                return
+
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.executemany(INSERT_PREDICTION_SQL, params)
+            conn.commit()
+            conn.close()
+    except Exception as e:
+        logger.exception("Error saving predictions: %s", e)
+
+
+def json_response(payload, status=200):
+    """jsonify the payload, timed as the json_serialize stage"""
+    with timed('json_serialize'):
+        return jsonify(payload), status
+
+def score_records(records, default_type='daily'):
+    """
+    Validate and score a mixed list of daily/hourly records with one model
+    call per type. Returns (results, saved): one result dict per record
+    (prediction or error, with its index) and the (type, record, value)
+    rows that were scored.
+    """
+    # Group records by model, keeping their position in the list
+    results = [None] * len(records)
+    groups = {'daily': [], 'hourly': []}
+    with timed('validation'):
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                results[i] = {"index": i, "error": "Record must be an object"}
+                continue
+
+            prediction_type = record.get('type', default_type)
+            if prediction_type not in groups:
+                results[i] = {"index": i, "error": f"Unknown type: {prediction_type}"}
+                continue
+
+            required_fields = DAILY_REQUIRED_FIELDS if prediction_type == 'daily' else HOURLY_REQUIRED_FIELDS
+            missing_fields = [field for field in required_fields if field not in record]
+            if missing_fields:
+                results[i] = {"index": i, "error": f"Missing fields: {', '.join(missing_fields)}"}
+                continue
+
+            groups[prediction_type].append(i)
+
+    # One model call per group
+    saved = []
+    for prediction_type, predict_batch in (('daily', predict_daily_batch),
+                                           ('hourly', predict_hourly_batch)):
+        indices = groups[prediction_type]
+        if not indices:
+            continue
+
+        predictions, errors = predict_batch([records[i] for i in indices])
+        for j, i in enumerate(indices):
+            if j in errors:
+                results[i] = {"index": i, "error": errors[j]}
+            else:
+                value = int(predictions[j])
+                results[i] = {"index": i, "type": prediction_type, "prediction": value}
+                saved.append((prediction_type, records[i], value))
+
+    return results, saved
+
+
 @predictions_bp.route('/daily', methods=['POST', 'OPTIONS'])
 def predict_daily_route():
     """Daily bike demand prediction"""
@@ -21,49 +177,28 @@ def predict_daily_route():
             return jsonify({"error": "No data provided"}), 400
 
         # Validate required fields
-        required_fields = ['date', 'season', 'yr', 'mnth', 'weekday', 'holiday',
-                          'workingday', 'weathersit', 'temp', 'atemp', 'hum', 'windspeed']
-
-        missing_fields = [field for field in required_fields if field not in data]
+        with timed('validation'):
+            missing_fields = [field for field in DAILY_REQUIRED_FIELDS if field not in data]
         if missing_fields:
             return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
 
-        # Make prediction
-        prediction = predict_daily(data)
+        # Make prediction ("exact": true bypasses the lookup table)
+        prediction = predict_daily(data, exact=bool(data.get('exact')))
 
         # Get user ID and save prediction (optional)
-        user_id = None
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            try:
-                payload = jwt.decode(token, Config.SECRET_KEY, algorithms=['HS256'])
-                user_id = payload.get('user_id')
-            except:
-                pass
-
+        user_id = get_user_id()
         if user_id:
-            try:
-                conn = get_db()
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO predictions (user_id, prediction_type, input_data, prediction_value)
-                    VALUES (?, ?, ?, ?)
-                ''', (user_id, 'daily', str(data), int(prediction)))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                print(f"Error saving prediction: {e}")
+            save_predictions(user_id, [('daily', data, prediction)])
 
-        return jsonify({
+        return json_response({
             "success": True,
             "prediction":  int(prediction),
             "type": "daily",
             "message": f"Predicted daily bike demand: {int(prediction)} bikes"
-        }), 200
+        })
 
     except Exception as e:
-        print(f"Daily prediction error: {str(e)}")
+        logger.exception("Daily prediction error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -80,53 +215,437 @@ def predict_hourly_route():
             return jsonify({"error": "No data provided"}), 400
 
         # Validate required fields
-        required_fields = ['date', 'season', 'yr', 'mnth', 'weekday', 'holiday',
-                          'workingday', 'weathersit', 'temp', 'atemp', 'hum',
-                          'windspeed', 'hr']
-
-        missing_fields = [field for field in required_fields if field not in data]
+        with timed('validation'):
+            missing_fields = [field for field in HOURLY_REQUIRED_FIELDS if field not in data]
         if missing_fields:
             return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
 
-        # Make prediction
-        prediction = predict_hourly(data)
+        # Make prediction ("exact": true bypasses the lookup table)
+        prediction = predict_hourly(data, exact=bool(data.get('exact')))
 
         # Save prediction (optional)
-        user_id = None
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            try:
-                payload = jwt.decode(token, Config. SECRET_KEY, algorithms=['HS256'])
-                user_id = payload.get('user_id')
-            except:
-                pass
-
+        user_id = get_user_id()
         if user_id:
-            try:
-                conn = get_db()
-                cursor = conn.cursor()
-                cursor. execute('''
-                    INSERT INTO predictions (user_id, prediction_type, input_data, prediction_value)
-                    VALUES (?, ?, ?, ?)
-                ''', (user_id, 'hourly', str(data), int(prediction)))
-                conn. commit()
-                conn.close()
-            except Exception as e:
-                print(f"Error saving prediction: {e}")
+            save_predictions(user_id, [('hourly', data, prediction)])
 
-        return jsonify({
+        return json_response({
             "success": True,
             "prediction":  int(prediction),
             "type": "hourly",
             "message": f"Predicted hourly bike demand: {int(prediction)} bikes"
-        }), 200
+        })
+
+    except Exception as e:
+        logger.exception("Hourly prediction error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@predictions_bp.route('/hourly-curve', methods=['POST', 'OPTIONS'])
+def predict_hourly_curve_route():
+    """Predict all 24 hours of one day with a single model call"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        # Same inputs as /hourly, minus 'hr'
+        with timed('validation'):
+            missing_fields = [field for field in DAILY_REQUIRED_FIELDS if field not in data]
+            if missing_fields:
+                return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
+
+            # Weather fields may be a single value or one value per hour
+            for field in WEATHER_FIELDS:
+                if isinstance(data[field], list) and len(data[field]) != 24:
+                    return jsonify({"error": f"{field} must be a single value or a list of 24 values"}), 400
+
+        columns = {field: data[field] for field in DAILY_REQUIRED_FIELDS}
+        columns['hr'] = list(range(24))
+
+        try:
+            predictions = predict_hourly_columns(columns)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid value: {str(e)}"}), 400
+
+        curve = [int(value) for value in predictions]
+
+        # Save predictions (optional)
+        user_id = get_user_id()
+        if user_id:
+            rows = []
+            for hr, value in enumerate(curve):
+                hour_data = {field: data[field][hr] if isinstance(data[field], list) else data[field]
+                             for field in DAILY_REQUIRED_FIELDS}
+                hour_data['hr'] = hr
+                rows.append(('hourly', hour_data, value))
+            save_predictions(user_id, rows)
+
+        return json_response({
+            "success": True,
+            "type": "hourly",
+            "date": data['date'],
+            "predictions": [{"hr": hr, "prediction": value} for hr, value in enumerate(curve)],
+            "total": sum(curve),
+            "peak_hour": curve.index(max(curve)),
+            "message": f"Predicted {sum(curve)} bikes across 24 hours"
+        })
+
+    except Exception as e:
+        logger.exception("Hourly curve prediction error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@predictions_bp.route('/horizon', methods=['POST', 'OPTIONS'])
+def predict_horizon_route():
+    """Forecast every day in a date range with one model call"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        required_fields = ['start_date', 'end_date'] + WEATHER_FIELDS
+        missing_fields = [field for field in required_fields if field not in data]
+        if missing_fields:
+            return jsonify({"error": f"Missing fields: {', '.join(missing_fields)}"}), 400
+
+        try:
+            dates = date_range(data['start_date'], data['end_date'])
+        except ValueError:
+            return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
+
+        n_days = len(dates)
+        if n_days == 0:
+            return jsonify({"error": "end_date must not be before start_date"}), 400
+        if n_days > Config.MAX_HORIZON_DAYS:
+            return jsonify({"error": f"Horizon too long (max {Config.MAX_HORIZON_DAYS} days)"}), 400
+
+        # Weather (and holiday/workingday) may be one value or one per day
+        columns = derive_date_columns(dates)
+        for field in WEATHER_FIELDS + ['holiday', 'workingday']:
+            if field not in data:
+                continue
+            if isinstance(data[field], list) and len(data[field]) != n_days:
+                return jsonify({"error": f"{field} must be a single value or a list of {n_days} values"}), 400
+            columns[field] = data[field]
+
+        try:
+            holiday = np.broadcast_to(np.asarray(columns.get('holiday', 0), dtype=np.float64), (n_days,))
+            columns['holiday'] = holiday
+            if 'workingday' not in columns:
+                weekday = columns['weekday']
+                columns['workingday'] = ((weekday >= 1) & (weekday <= 5) & (holiday == 0)).astype(int)
+
+            daily = predict_daily_columns(columns)
+
+            hourly = None
+            if data.get('hourly'):
+                # Expand each day to 24 hours, reusing that day's weather
+                hourly_columns = {
+                    field: np.repeat(np.broadcast_to(np.asarray(values), (n_days,)), 24)
+                    for field, values in columns.items()
+                }
+                hourly_columns['hr'] = np.tile(np.arange(24), n_days)
+                hourly = predict_hourly_columns(hourly_columns).reshape(n_days, 24)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid value: {str(e)}"}), 400
+
+        forecast = []
+        for i, day in enumerate(dates.astype(str)):
+            entry = {"date": day, "prediction": int(daily[i])}
+            if hourly is not None:
+                entry["hourly"] = hourly[i].astype(int).tolist()
+            forecast.append(entry)
+
+        total = int(daily.astype(int).sum())
+        return json_response({
+            "success": True,
+            "type": "horizon",
+            "days": n_days,
+            "forecast": forecast,
+            "total": total,
+            "message": f"Predicted {total} bikes over {n_days} days"
+        })
+
+    except Exception as e:
+        logger.exception("Horizon prediction error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+def sweep_values(axis):
+    """Values of one sweep axis: an explicit list, or start/stop/steps"""
+    if 'values' in axis:
+        values = axis['values']
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"{axis['field']}: 'values' must be a non-empty list")
+        return np.asarray(values, dtype=np.float64)
+
+    steps = int(axis.get('steps', 0))
+    if steps < 2 or 'start' not in axis or 'stop' not in axis:
+        raise ValueError(f"{axis['field']}: give 'values' or 'start', 'stop' and 'steps' (>= 2)")
+    if steps > Config.MAX_SWEEP_POINTS:
+        raise ValueError(f"{axis['field']}: too many steps (max {Config.MAX_SWEEP_POINTS})")
+    return np.linspace(float(axis['start']), float(axis['stop']), steps)
+
+
+@predictions_bp.route('/sweep', methods=['POST', 'OPTIONS'])
+def predict_sweep_route():
+    """Response surface over one or two swept inputs, from one model call"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        data = request.get_json()
+
+        if not data or not isinstance(data, dict):
+            return jsonify({"error": "No data provided"}), 400
+
+        prediction_type = data.get('type', 'daily')
+        if prediction_type not in ('daily', 'hourly'):
+            return jsonify({"error": f"Unknown type: {prediction_type}"}), 400
+
+        base = data.get('base') or {}
+        axes = data.get('sweep')
+        with timed('validation'):
+            if not isinstance(base, dict):
+                return jsonify({"error": "'base' must be an object"}), 400
+            if not isinstance(axes, list) or not 1 <= len(axes) <= 2:
+                return jsonify({"error": "'sweep' must be a list of one or two axes"}), 400
+
+            fields = []
+            for axis in axes:
+                field = axis.get('field') if isinstance(axis, dict) else None
+                if field not in SWEEP_FIELDS or (field == 'hr' and prediction_type == 'daily'):
+                    return jsonify({"error": f"Cannot sweep field: {field}"}), 400
+                if field in fields:
+                    return jsonify({"error": f"Field swept twice: {field}"}), 400
+                fields.append(field)
+
+            required_fields = DAILY_REQUIRED_FIELDS if prediction_type == 'daily' else HOURLY_REQUIRED_FIELDS
+            missing_fields = [field for field in required_fields if field not in base and field not in fields]
+            if missing_fields:
+                return jsonify({"error": f"Missing fields in base: {', '.join(missing_fields)}"}), 400
+
+            try:
+                values = [sweep_values(axis) for axis in axes]
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Invalid sweep: {str(e)}"}), 400
+
+            n_points = int(np.prod([len(v) for v in values]))
+            if n_points > Config.MAX_SWEEP_POINTS:
+                return jsonify({"error": f"Sweep too large: {n_points} points (max {Config.MAX_SWEEP_POINTS})"}), 400
+
+        # Base scenario broadcast against the flattened grid
+        columns = {field: base[field] for field in required_fields if field in base}
+        grids = np.meshgrid(*values, indexing='ij')
+        for field, grid in zip(fields, grids):
+            columns[field] = grid.ravel()
+
+        try:
+            if prediction_type == 'daily':
+                predictions = predict_daily_columns(columns)
+            else:
+                predictions = predict_hourly_columns(columns)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid value: {str(e)}"}), 400
+
+        surface = predictions.astype(int)
+        extremes = {}
+        for name, i in (('max', int(surface.argmax())), ('min', int(surface.argmin()))):
+            extremes[name] = {"prediction": int(surface[i])}
+            extremes[name].update({field: float(grid.flat[i]) for field, grid in zip(fields, grids)})
+
+        return json_response({
+            "success": True,
+            "type": prediction_type,
+            "axes": [{"field": field, "values": v.tolist()} for field, v in zip(fields, values)],
+            "points": n_points,
+            "predictions": surface.reshape([len(v) for v in values]).tolist(),
+            "max": extremes['max'],
+            "min": extremes['min'],
+        })
 
     except Exception as e:
-        print(f"Hourly prediction error: {str(e)}")
+        logger.exception("Sweep prediction error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
+@predictions_bp.route('/batch', methods=['POST', 'OPTIONS'])
+def predict_batch_route():
+    """Score a mixed list of daily/hourly records in one request"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        records = data.get('records') if isinstance(data, dict) else data
+        if not isinstance(records, list) or not records:
+            return jsonify({"error": "'records' must be a non-empty list"}), 400
+
+        if len(records) > Config.MAX_BATCH_SIZE:
+            return jsonify({"error": f"Batch too large (max {Config.MAX_BATCH_SIZE} records)"}), 400
+
+        results, saved = score_records(records)
+
+        # Save predictions (optional)
+        user_id = get_user_id()
+        if user_id and saved:
+            save_predictions(user_id, saved)
+
+        error_count = sum(1 for r in results if 'error' in r)
+        return json_response({
+            "success": True,
+            "count": len(results),
+            "errors": error_count,
+            "predictions": results
+        })
+
+    except Exception as e:
+        logger.exception("Batch prediction error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+def text_lines(stream, block_size=1 << 16):
+    """Decoded lines from a binary stream, read in blocks (a BOM is dropped)"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    while True:
+        block = stream.read(block_size)
+        pending += decoder.decode(block, final=not block)
+        lines = pending.splitlines(keepends=True)
+        if block and lines and not lines[-1].endswith(('\n', '\r')):
+            pending = lines.pop()
+        else:
+            pending = ''
+        yield from lines
+        if not block:
+            break
+
+
+def csv_records(lines):
+    """Feature dicts from CSV lines; numeric cells become floats, empty cells are omitted"""
+    for row in csv.DictReader(lines):
+        record = {}
+        for key, value in row.items():
+            if key is None or value is None or value.strip() == '':
+                continue
+            key = key.strip()
+            if key in ('date', 'type', 'id'):
+                record[key] = value.strip()
+            else:
+                try:
+                    record[key] = float(value)
+                except ValueError:
+                    record[key] = value
+        yield record
+
+
+def encode_bulk_results(results, records, offset, output_format):
+    """NDJSON lines or CSV rows for one scored chunk"""
+    if output_format == 'ndjson':
+        lines = []
+        for result, record in zip(results, records):
+            line = {"row": offset + result['index']}
+            if 'id' in record:
+                line['id'] = record['id']
+            line.update((k, v) for k, v in result.items() if k != 'index')
+            lines.append(json.dumps(line))
+        return '\n'.join(lines) + '\n'
+
+    return csv_chunk([offset + result['index'], record.get('id', ''), result.get('type', ''),
+                      result.get('prediction', ''), result.get('error', '')]
+                     for result, record in zip(results, records))
+
+
+def bulk_output(records, default_type, output_format):
+    """
+    Score records BULK_CHUNK_SIZE at a time. Yields (rows_done, text): the
+    CSV header first (if any), then the encoded results of each chunk.
+    """
+    if output_format == 'csv':
+        yield 0, csv_chunk([BULK_CSV_COLUMNS])
+
+    chunk_size = max(1, Config.BULK_CHUNK_SIZE)
+    offset = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        results, _ = score_records(chunk, default_type)
+        with timed('json_serialize'):
+            output = encode_bulk_results(results, chunk, offset, output_format)
+        offset += len(chunk)
+        yield offset, output
+
+
+@predictions_bp.route('/bulk', methods=['POST', 'OPTIONS'])
+def predict_bulk_route():
+    """
+    Score a CSV of daily/hourly inputs and stream the predictions back.
+
+    The CSV is the request body (Content-Type: text/csv) or a multipart
+    'file'. Rows are read and scored BULK_CHUNK_SIZE at a time, so memory
+    stays bounded and output starts before the upload is fully read.
+    ?format=ndjson|csv selects the output; ?type=daily|hourly is the
+    default for rows without a 'type' column. Results are not saved.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    output_format = request.args.get('format', 'ndjson')
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    default_type = request.args.get('type', 'daily')
+    if default_type not in ('daily', 'hourly'):
+        return jsonify({"error": f"Unknown type: {default_type}"}), 400
+
+    if request.mimetype == 'multipart/form-data':
+        if 'file' not in request.files:
+            return jsonify({"error": "No file provided"}), 400
+        stream = request.files['file'].stream
+    else:
+        stream = request.stream
+
+    records = csv_records(text_lines(stream))
+
+    def generate():
+        offset = 0
+        try:
+            for offset, output in bulk_output(records, default_type, output_format):
+                yield output
+            logger.info("Bulk scoring finished: %d rows", offset)
+        except Exception as e:
+            # Headers are already sent; report the failure in-band and stop
+            logger.exception("Bulk prediction error after %d rows: %s", offset, e)
+            yield encode_bulk_results([{"index": 0, "error": f"Aborted: {str(e)}"}], [{}],
+                                      offset, output_format)
+
+    return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[output_format])
+
+
+def predict_extracted(extracted_data, prediction_type):
+    """Predict from the fields extracted from a PDF"""
+    if prediction_type == 'daily':
+        return predict_daily(extracted_data)
+
+    # For hourly, ensure 'hr' is present
+    if 'hr' not in extracted_data:
+        extracted_data['hr'] = 12  # Default to noon
+    return predict_hourly(extracted_data)
+
+
 @predictions_bp.route('/upload-pdf', methods=['POST', 'OPTIONS'])
 def upload_pdf():
     """Handle PDF upload and extract prediction data"""
@@ -154,7 +673,7 @@ def upload_pdf():
         file_path = os. path.join(upload_folder, file.filename)
         file.save(file_path)
 
-        print(f"PDF saved to: {file_path}")
+        logger.debug("PDF saved to: %s", file_path)
 
         # Extract data from PDF
         extracted_data = extract_data_from_pdf(file_path)
@@ -165,13 +684,7 @@ def upload_pdf():
 
         # Make prediction based on type
         try:
-            if prediction_type == 'daily':
-                prediction = predict_daily(extracted_data)
-            else:
-                # For hourly, ensure 'hr' is present
-                if 'hr' not in extracted_data:
-                    extracted_data['hr'] = 12  # Default to noon
-                prediction = predict_hourly(extracted_data)
+            prediction = predict_extracted(extracted_data, prediction_type)
         except Exception as pred_error:
             os.remove(file_path)
             return jsonify({"error": f"Prediction failed: {str(pred_error)}"}), 500
@@ -191,7 +704,7 @@ def upload_pdf():
         }), 200
 
     except Exception as e:
-        print(f"PDF upload error: {str(e)}")
+        logger.exception("PDF upload error: %s", e)
         # Try to clean up file if it exists
         try:
             if 'file_path' in locals():
@@ -203,7 +716,7 @@ def upload_pdf():
 
 @predictions_bp.route('/history', methods=['GET', 'OPTIONS'])
 def get_prediction_history():
-    """Get user's prediction history"""
+    """Get user's prediction history, newest first (?limit=, ?cursor= from next_cursor)"""
     if request.method == 'OPTIONS':
         return '', 200
 
@@ -221,18 +734,20 @@ def get_prediction_history():
         except:
             return jsonify({"error": "Invalid token"}), 401
 
-        # Get predictions from database
+        try:
+            limit = page_size(request.args.get('limit'))
+            cursor = request.args.get('cursor') or None
+            if cursor is not None:
+                decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid limit or cursor"}), 400
+
+        # One page from database (served by idx_predictions_user_recent)
         conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, prediction_type, prediction_value, created_at
-            FROM predictions
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            LIMIT 20
-        ''', (user_id,))
-
-        predictions = cursor.fetchall()
+        predictions, next_cursor = fetch_page(
+            conn, 'predictions', ('id', 'prediction_type', 'prediction_value', 'created_at'),
+            user_id, limit, cursor
+        )
         conn.close()
 
         history = []
@@ -246,9 +761,74 @@ def get_prediction_history():
 
         return jsonify({
             "success": True,
-            "predictions": history
+            "predictions": history,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
         }), 200
 
     except Exception as e:
-        print(f"History error: {str(e)}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        logger.exception("History error: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# Columns of /export: the prediction and its typed inputs
+EXPORT_COLUMNS = ['id', 'prediction_type', 'prediction_value', 'created_at'] + \
+    [column for column, _, _ in PREDICTION_FEATURE_COLUMNS]
+
+
+@predictions_bp.route('/export', methods=['GET', 'OPTIONS'])
+def export_predictions():
+    """
+    Stream the user's full prediction history, oldest first.
+
+    ?format=csv|ndjson selects the output and ?gzip=true compresses it
+    (Content-Encoding: gzip). Rows are read EXPORT_BATCH_SIZE at a time,
+    so this replaces paging through /history for bulk pulls.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+
+    output_format = request.args.get('format', 'csv')
+    if output_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    return export_response(f'''
+        SELECT {', '.join(EXPORT_COLUMNS)}
+        FROM predictions
+        WHERE user_id = ?
+        ORDER BY created_at, id
+    ''', (user_id,), EXPORT_COLUMNS, output_format,
+        compress=request.args.get('gzip', '').lower() in ('1', 'true'),
+        filename='predictions')
+
+
+@predictions_bp.route('/cache/stats', methods=['GET', 'OPTIONS'])
+def prediction_cache_stats():
+    """Hit/miss/eviction counters and memory use of the prediction cache"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    return jsonify({"success": True, "cache": PREDICTION_CACHE.stats()}), 200
+
+
+@predictions_bp.route('/writer/stats', methods=['GET', 'OPTIONS'])
+def prediction_writer_stats_route():
+    """Queue depth, batch sizes and drop/spill counters of the prediction writer"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    return jsonify({"success": True, "enabled": Config.PREDICTION_WRITE_BEHIND,
+                    "writer": prediction_writer_stats()}), 200
+
+
+@predictions_bp.route('/batcher/stats', methods=['GET', 'OPTIONS'])
+def prediction_batcher_stats():
+    """Batch-size distribution and queue wait of the micro-batchers"""
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    return jsonify({"success": True, "micro_batching": batcher_stats()}), 200
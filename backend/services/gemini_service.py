@@ -1,6 +1,9 @@
+import logging
 import google.generativeai as genai
 from config import Config
 
+logger = logging.getLogger(__name__)
+
 # Configure Gemini
 genai.configure(api_key=Config. GEMINI_API_KEY)
 
@@ -84,7 +87,7 @@ def generate_ai_response(user_message, chat_history=None):
         return response. text. strip()
 
     except Exception as e:
-        print(f"Gemini API error: {e}")
+        logger.warning("Gemini API error: %s", e)
         # Fallback to rule-based response
         return generate_fallback_response(user_message)
 
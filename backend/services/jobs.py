@@ -0,0 +1,368 @@
+"""
+Background jobs backed by SQLite.
+
+Long-running work (bulk scoring, PDF parsing, model warm-up) is submitted
+as a row in the `jobs` table and run by a dispatcher thread on a local
+thread pool, so request threads return immediately with a job id. There
+is no broker: every API worker runs a dispatcher, jobs are claimed with a
+conditional UPDATE (only one worker wins), and running jobs are
+heartbeated. A job whose worker stopped heartbeating (crash, restart,
+redeploy) is re-queued if its kind is resumable and it has attempts left,
+otherwise marked failed.
+
+Files a job reads or writes live in JOB_DIR/<job_id>/ and are deleted
+with the row when the job's result expires.
+"""
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from config import Config
+from utils.database import get_db
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# This process, as recorded in jobs.worker: "host:pid:nonce"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+# Minimum seconds between progress/cancel-flag round trips to the database
+_PROGRESS_INTERVAL = 0.5
+
+# kind -> (handler, resumable)
+_JOB_KINDS = {}
+
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when the job has been cancelled"""
+
+
+def register_job_kind(kind, handler, resumable=True):
+    """
+    Register handler(job, context) for a job kind. The handler returns
+    (result, result_path): a JSON-serialisable summary and optionally a
+    file served by the result endpoint. Resumable handlers must be safe to
+    run again from the start after an interruption.
+    """
+    _JOB_KINDS[kind] = (handler, resumable)
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+def job_dir(job_id, create=False):
+    """Directory for a job's input and output files"""
+    path = os.path.join(Config.JOB_DIR, job_id)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _execute(sql, params=()):
+    """Run one statement in its own transaction; returns the affected row count"""
+    conn = get_db()
+    try:
+        cursor = conn.execute(sql, params)
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def _query(sql, params=()):
+    conn = get_db()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _iso(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+def _job_dict(row):
+    job = dict(row)
+    job['params'] = json.loads(job['params'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+def submit_job(kind, params, user_id=None, job_id=None):
+    """Queue a job and return its id"""
+    if kind not in _JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job_id = job_id or new_job_id()
+    _execute('''
+        INSERT INTO jobs (id, user_id, kind, status, params, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (job_id, user_id, kind, QUEUED, json.dumps(params), time.time()))
+
+    logger.info("Job %s queued: %s", job_id, kind)
+    if _RUNNER is not None:
+        _RUNNER.wake()
+    return job_id
+
+
+def get_job(job_id):
+    """The job's row as a dict (params/result decoded), or None if unknown or expired"""
+    rows = _query('SELECT * FROM jobs WHERE id = ?', (job_id,))
+    if not rows:
+        return None
+    job = _job_dict(rows[0])
+    if job['expires_at'] is not None and job['expires_at'] < time.time():
+        return None
+    return job
+
+
+def describe_job(job):
+    """Public view of a job for the API"""
+    return {
+        "id": job['id'],
+        "kind": job['kind'],
+        "status": job['status'],
+        "progress": round(100 * (job['progress'] or 0), 1),
+        "attempts": job['attempts'],
+        "error": job['error'],
+        "cancel_requested": bool(job['cancel_requested']),
+        "has_result": job['status'] == SUCCEEDED,
+        "created_at": _iso(job['created_at']),
+        "started_at": _iso(job['started_at']),
+        "finished_at": _iso(job['finished_at']),
+        "expires_at": _iso(job['expires_at']),
+    }
+
+
+def cancel_job(job_id):
+    """
+    Cancel a job. A queued job is cancelled at once; a running job is
+    flagged and stops at its next check. Returns the job afterwards, or
+    None if it doesn't exist.
+    """
+    now = time.time()
+    _execute('''
+        UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ?, expires_at = ?
+        WHERE id = ? AND status = ?
+    ''', (CANCELLED, now, now + Config.JOB_RESULT_TTL, job_id, QUEUED))
+    _execute('UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?', (job_id, RUNNING))
+    return get_job(job_id)
+
+
+def _finish(job_id, status, result=None, result_path=None, error=None):
+    now = time.time()
+    _execute('''
+        UPDATE jobs SET status = ?, result = ?, result_path = ?, error = ?,
+                        progress = CASE WHEN ? = 'succeeded' THEN 1 ELSE progress END,
+                        finished_at = ?, expires_at = ?
+        WHERE id = ? AND worker = ? AND status = ?
+    ''', (status, json.dumps(result) if result is not None else None, result_path, error,
+          status, now, now + Config.JOB_RESULT_TTL, job_id, WORKER_ID, RUNNING))
+
+
+class JobContext:
+    """Passed to handlers: progress reporting, cancellation checks and the job's directory"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._last_sync = 0.0
+
+    def path(self, name):
+        return os.path.join(job_dir(self.job_id, create=True), name)
+
+    def progress(self, fraction):
+        """Record progress (0..1) and raise JobCancelled if the job was cancelled"""
+        now = time.monotonic()
+        if now - self._last_sync < _PROGRESS_INTERVAL:
+            return
+        self._last_sync = now
+
+        rows = _query('SELECT cancel_requested FROM jobs WHERE id = ?', (self.job_id,))
+        if not rows or rows[0]['cancel_requested']:
+            raise JobCancelled()
+        _execute('UPDATE jobs SET progress = ? WHERE id = ? AND worker = ?',
+                 (min(max(fraction, 0.0), 1.0), self.job_id, WORKER_ID))
+
+
+def _worker_gone(worker):
+    """True if the worker ran on this host and its process no longer exists"""
+    try:
+        host, pid, _ = worker.split(':')
+        if host != socket.gethostname():
+            return False
+        if worker == WORKER_ID:
+            return False
+        os.kill(int(pid), 0)
+        return False
+    except ProcessLookupError:
+        return True
+    except (ValueError, PermissionError, OSError):
+        return False
+
+
+class JobRunner:
+    """Claims queued jobs and runs them on a thread pool; one per process"""
+
+    def __init__(self, workers, poll_interval):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self.running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._last_purge = 0.0
+        self.thread = threading.Thread(target=self._loop, name='job-dispatcher', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self._heartbeat()
+                self._recover()
+                self._claim()
+                if time.monotonic() - self._last_purge > 60:
+                    purge_expired_jobs()
+                    self._last_purge = time.monotonic()
+            except Exception as e:
+                logger.exception("Job dispatcher error: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _heartbeat(self):
+        with self._lock:
+            running = list(self.running)
+        if running:
+            placeholders = ','.join('?' * len(running))
+            _execute(f'UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND id IN ({placeholders})',
+                     (time.time(), WORKER_ID, *running))
+
+    def _recover(self):
+        """Re-queue or fail jobs whose worker stopped heartbeating"""
+        cutoff = time.time() - Config.JOB_STALE_SECONDS
+        rows = _query('SELECT id, kind, attempts, worker, heartbeat_at FROM jobs WHERE status = ?',
+                      (RUNNING,))
+        for row in rows:
+            if row['worker'] == WORKER_ID:
+                continue
+            if (row['heartbeat_at'] or 0) >= cutoff and not _worker_gone(row['worker'] or ''):
+                continue
+
+            _, resumable = _JOB_KINDS.get(row['kind'], (None, False))
+            if resumable and row['attempts'] < Config.JOB_MAX_ATTEMPTS:
+                changed = _execute('''
+                    UPDATE jobs SET status = ?, worker = NULL, progress = 0
+                    WHERE id = ? AND status = ? AND worker = ?
+                ''', (QUEUED, row['id'], RUNNING, row['worker']))
+                if changed:
+                    logger.warning("Job %s interrupted on %s; re-queued", row['id'], row['worker'])
+            else:
+                now = time.time()
+                changed = _execute('''
+                    UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ?
+                    WHERE id = ? AND status = ? AND worker = ?
+                ''', (FAILED, 'Interrupted by a worker restart', now, now + Config.JOB_RESULT_TTL,
+                      row['id'], RUNNING, row['worker']))
+                if changed:
+                    logger.warning("Job %s interrupted on %s; marked failed", row['id'], row['worker'])
+
+    def _claim(self):
+        with self._lock:
+            free = self.workers - len(self.running)
+        if free <= 0:
+            return
+
+        rows = _query('SELECT id, kind FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?',
+                      (QUEUED, free))
+        for row in rows:
+            if row['kind'] not in _JOB_KINDS:
+                # Submitted by a newer build; leave it for a worker that knows it
+                continue
+            now = time.time()
+            claimed = _execute('''
+                UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1,
+                                started_at = ?, heartbeat_at = ?
+                WHERE id = ? AND status = ?
+            ''', (RUNNING, WORKER_ID, now, now, row['id'], QUEUED))
+            if claimed:
+                with self._lock:
+                    self.running.add(row['id'])
+                self.executor.submit(self._run, row['id'])
+
+    def _run(self, job_id):
+        try:
+            job = _job_dict(_query('SELECT * FROM jobs WHERE id = ?', (job_id,))[0])
+            handler, _ = _JOB_KINDS[job['kind']]
+            logger.info("Job %s started: %s (attempt %d)", job_id, job['kind'], job['attempts'])
+
+            result, result_path = handler(job, JobContext(job_id))
+            _finish(job_id, SUCCEEDED, result=result, result_path=result_path)
+            logger.info("Job %s succeeded", job_id)
+
+        except JobCancelled:
+            _finish(job_id, CANCELLED)
+            logger.info("Job %s cancelled", job_id)
+
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            _finish(job_id, FAILED, error=str(e))
+
+        finally:
+            with self._lock:
+                self.running.discard(job_id)
+            self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {"worker": WORKER_ID, "workers": self.workers, "running": len(self.running)}
+
+
+def purge_expired_jobs():
+    """Delete jobs whose retention has expired, with their files"""
+    now = time.time()
+    rows = _query('SELECT id FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?', (now,))
+    for row in rows:
+        shutil.rmtree(job_dir(row['id']), ignore_errors=True)
+    if rows:
+        _execute('DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?', (now,))
+        logger.info("Purged %d expired jobs", len(rows))
+    return len(rows)
+
+
+def start_job_runner():
+    """Start this process's job dispatcher (once)"""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = JobRunner(Config.JOB_WORKERS, Config.JOB_POLL_INTERVAL)
+            _RUNNER.start()
+        return _RUNNER
+
+
+def job_runner_stats():
+    """Dispatcher stats for this process, or None if it isn't running"""
+    return _RUNNER.stats() if _RUNNER is not None else None
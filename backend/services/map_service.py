@@ -2,8 +2,11 @@ import requests
 import json
 import os
 from config import Config
+import logging
 import math
 
+logger = logging.getLogger(__name__)
+
 BIKESHARE_FEEDS = {
     'capital': {
         'name': 'Capital Bikeshare (DC)',
@@ -57,11 +60,11 @@ def fetch_live_stations(city='capital'):
                 'status': 'active' if status.get('is_renting', 0) == 1 else 'inactive'
             })
 
-        print(f"✓ Fetched {len(stations)} live stations from {feed['name']}")
+        logger.info("Fetched %d live stations from %s", len(stations), feed['name'])
         return stations
 
     except Exception as e:
-        print(f"Error fetching live stations: {e}")
+        logger.warning("Error fetching live stations: %s", e)
         return load_static_stations()
 
 def load_static_stations():
@@ -70,11 +73,11 @@ def load_static_stations():
         if os.path.exists(Config.STATIONS_DATA_PATH):
             with open(Config. STATIONS_DATA_PATH, 'r') as f:
                 stations = json.load(f)
-                print(f"✓ Loaded {len(stations)} stations from static file")
+                logger.info("Loaded %d stations from static file", len(stations))
                 return stations
         return []
     except Exception as e:
-        print(f"Error loading static stations:  {e}")
+        logger.exception("Error loading static stations: %s", e)
         return []
 
 def calculate_distance(lat1, lon1, lat2, lon2):
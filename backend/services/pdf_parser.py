@@ -1,6 +1,10 @@
+import logging
 import re
 import PyPDF2
 from datetime import datetime
+from utils.dates import derive_date_features
+
+logger = logging.getLogger(__name__)
 
 
 def extract_data_from_pdf(pdf_path):
@@ -21,14 +25,10 @@ def extract_data_from_pdf(pdf_path):
                 if page_text:
                     text += page_text + "\n"
 
-        print("=" * 60)
-        print("RAW PDF TEXT")
-        print("=" * 60)
-        print(text)
-        print("=" * 60)
+        logger.debug("Extracted %d characters of text from %s", len(text), pdf_path)
 
         if not text.strip():
-            print("❌ PDF has no extractable text")
+            logger.warning("PDF has no extractable text")
             return None
 
         text_lower = text.lower()
@@ -43,7 +43,7 @@ def extract_data_from_pdf(pdf_path):
         )
 
         if not date_match:
-            print("❌ Date is mandatory but not found")
+            logger.warning("Date is mandatory but not found in PDF")
             return None
 
         raw_date = date_match.group(1)
@@ -73,7 +73,7 @@ def extract_data_from_pdf(pdf_path):
         # --------------------------------------------------
         temp_match = re.search(r"temperature\s*[:\-]?\s*([\d.]+)", text_lower)
         if not temp_match:
-            print("❌ Temperature is mandatory")
+            logger.warning("Temperature is mandatory but not found in PDF")
             return None
 
         temp = float(temp_match.group(1))
@@ -108,25 +108,8 @@ def extract_data_from_pdf(pdf_path):
         # --------------------------------------------------
         # DERIVED DATE FEATURES (MODEL CRITICAL)
         # --------------------------------------------------
-        month = date_obj.month
-        weekday = (date_obj.weekday() + 1) % 7
-
-        if month in [3, 4, 5]:
-            season = 2
-        elif month in [6, 7, 8]:
-            season = 3
-        elif month in [9, 10, 11]:
-            season = 4
-        else:
-            season = 1
-
-        data.update({
-            "mnth": month,
-            "weekday": weekday,
-            "season": season,
-            "yr": 1 if date_obj.year >= 2012 else 0,
-            "atemp": data["temp"],  # model expects atemp
-        })
+        data.update(derive_date_features(date_obj))
+        data["atemp"] = data["temp"]  # model expects atemp
 
         # --------------------------------------------------
         # FINAL VALIDATION
@@ -140,22 +123,16 @@ def extract_data_from_pdf(pdf_path):
 
         missing = [f for f in REQUIRED_FIELDS if f not in data]
         if missing:
-            print("❌ Missing required fields:", missing)
+            logger.warning("PDF is missing required fields: %s", missing)
             return None
 
         # --------------------------------------------------
         # DEBUG OUTPUT
         # --------------------------------------------------
-        print("=" * 60)
-        print("✅ FINAL FEATURE DICTIONARY (MODEL INPUT)")
-        print("=" * 60)
-        for k, v in sorted(data.items()):
-            print(f"{k:12} : {v}")
+        logger.debug("Extracted PDF features", extra={"features": data})
 
         return data
 
     except Exception as e:
-        print("❌ PDF parsing error:", str(e))
-        import traceback
-        traceback.print_exc()
+        logger.exception("PDF parsing error: %s", e)
         return None
@@ -1,6 +1,9 @@
+import logging
 import speech_recognition as sr
 import os
 
+logger = logging.getLogger(__name__)
+
 def transcribe_audio(audio_file):
     """Transcribe audio to text"""
     try:
@@ -15,7 +18,7 @@ def transcribe_audio(audio_file):
 
         try:
             text = recognizer. recognize_google(audio_data)
-            print(f"Transcribed text: {text}")
+            logger.debug("Transcribed %d characters of audio text", len(text))
 
             if os.path.exists(temp_path):
                 os.remove(temp_path)
@@ -23,17 +26,17 @@ def transcribe_audio(audio_file):
             return text
 
         except sr. UnknownValueError:
-            print("Could not understand audio")
+            logger.info("Could not understand audio")
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             return None
 
         except sr.RequestError as e:
-            print(f"Speech recognition error: {e}")
+            logger.warning("Speech recognition error: %s", e)
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             return None
 
     except Exception as e:
-        print(f"Audio transcription error: {str(e)}")
+        logger.exception("Audio transcription error: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from models.engines import BoosterEngine, NumpyTreeEngine
+
+
+def train_booster(seed, n_features=12, rounds=40, depth=6):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(2000, n_features)).astype(np.float32)
+    target = features[:, 0] * 300 + np.sin(features[:, 1]) * 50 + rng.normal(size=2000) * 10 + 4000
+    features[rng.random(features.shape) < 0.05] = np.nan  # learn default directions
+    params = {'objective': 'reg:squarederror', 'max_depth': depth, 'seed': seed}
+    return xgb.train(params, xgb.DMatrix(features, label=target), num_boost_round=rounds)
+
+
+def random_inputs(seed, n_rows, n_features=12):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(scale=2.0, size=(n_rows, n_features)).astype(np.float32)
+    features[rng.random(features.shape) < 0.1] = np.nan
+    return features
+
+
+@pytest.mark.parametrize('seed, depth', [(0, 6), (1, 3), (2, 8)])
+def test_numpy_engine_matches_booster(seed, depth):
+    booster = train_booster(seed, depth=depth)
+    engine = NumpyTreeEngine(booster)
+
+    for n_rows in (1, 7, 32, 5000):
+        features = random_inputs(seed + n_rows, n_rows)
+        expected = booster.predict(xgb.DMatrix(features))
+        np.testing.assert_allclose(engine.predict(features), expected, rtol=1e-5, atol=1e-3)
+
+
+def test_numpy_engine_sends_large_batches_to_fallback():
+    booster = train_booster(3)
+    fallback = BoosterEngine(booster)
+    engine = NumpyTreeEngine(booster, fallback=fallback, max_rows=32)
+    calls = []
+    fallback.predict = lambda features: calls.append(len(features)) or np.zeros(len(features))
+
+    engine.predict(random_inputs(4, 32))
+    assert calls == []
+    assert not engine.predict(random_inputs(5, 33)).any()
+    assert calls == [33]
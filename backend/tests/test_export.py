@@ -0,0 +1,50 @@
+import csv
+import gzip
+import io
+import sqlite3
+
+from config import Config
+from utils.export import export_chunks, gzip_chunks
+
+COLUMNS = ['id', 'message', 'created_at']
+ROWS = [
+    (1, 'plain', '2024-01-01 00:00:00'),
+    (2, 'comma, and "quotes"', '2024-01-01 00:00:01'),
+    (3, 'two\nlines', '2024-01-01 00:00:02'),
+    (4, None, '2024-01-01 00:00:03'),
+]
+
+
+def export_csv(monkeypatch, batch_size=2):
+    monkeypatch.setattr(Config, 'EXPORT_BATCH_SIZE', batch_size)
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE chats (id INTEGER, message TEXT, created_at TEXT)')
+    conn.executemany('INSERT INTO chats VALUES (?, ?, ?)', ROWS)
+    chunks = list(export_chunks(conn, 'SELECT id, message, created_at FROM chats ORDER BY id',
+                                (), COLUMNS, 'csv'))
+    conn.close()
+    return chunks
+
+
+def test_csv_export_uses_one_line_ending(monkeypatch):
+    text = ''.join(export_csv(monkeypatch))
+
+    assert '\r' not in text
+    assert text.startswith('id,message,created_at\n')
+    assert text.endswith('\n')
+
+
+def test_csv_export_round_trips(monkeypatch):
+    chunks = export_csv(monkeypatch, batch_size=3)
+
+    # Header, then one chunk per fetchmany batch
+    assert len(chunks) == 3
+    parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert parsed[0] == COLUMNS
+    assert parsed[1:] == [[str(i), m or '', c] for i, m, c in ROWS]
+
+
+def test_gzip_export_matches_plain(monkeypatch):
+    chunks = export_csv(monkeypatch)
+
+    assert gzip.decompress(b''.join(gzip_chunks(chunks))).decode() == ''.join(chunks)
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from models.ml_model import (
+    DAILY_INPUT_FIELDS, HOURLY_INPUT_FIELDS, daily_feature_matrix, engineer_daily_features,
+    engineer_hourly_features, hourly_feature_matrix, records_to_columns
+)
+
+INT_RANGES = {'season': (1, 4), 'yr': (0, 1), 'mnth': (1, 12), 'weekday': (0, 6),
+              'holiday': (0, 1), 'workingday': (0, 1), 'weathersit': (1, 4), 'hr': (0, 23)}
+FLOAT_FIELDS = ('temp', 'atemp', 'hum', 'windspeed')
+DATES = ('2012-06-01', '2011-01-31', '2012-02-29', '2012-13-01', 'not a date', '', 20120601, None)
+
+
+def random_record(rng):
+    """A record the scalar path accepts, mixing ints, floats and numeric strings"""
+    record = {}
+    for field, (low, high) in INT_RANGES.items():
+        value = rng.randint(low, high)
+        kind = rng.random()
+        if kind < 0.2:
+            record[field] = str(value)
+        elif kind < 0.4:
+            record[field] = value + rng.random() * 0.99  # int() truncates
+        elif kind < 0.5 and field in ('yr', 'holiday', 'hr'):
+            continue  # defaulted
+        else:
+            record[field] = value
+    for field in FLOAT_FIELDS:
+        value = rng.uniform(-0.2, 1.2)
+        record[field] = repr(value) if rng.random() < 0.2 else value
+    date = rng.choice(DATES)
+    if date is not None:
+        record['date'] = date
+    return record
+
+
+@pytest.mark.parametrize('fields, build_matrix, engineer', [
+    (DAILY_INPUT_FIELDS, daily_feature_matrix, engineer_daily_features),
+    (HOURLY_INPUT_FIELDS, hourly_feature_matrix, engineer_hourly_features),
+])
+def test_columnar_matches_scalar_rows(fields, build_matrix, engineer):
+    rng = random.Random(7)
+    records = [random_record(rng) for _ in range(5000)]
+
+    columnar = build_matrix(records_to_columns(records, fields))
+    scalar = np.vstack([engineer(record) for record in records])
+
+    assert np.array_equal(columnar, scalar)
+
+
+@pytest.mark.parametrize('fields, build_matrix, engineer', [
+    (DAILY_INPUT_FIELDS, daily_feature_matrix, engineer_daily_features),
+    (HOURLY_INPUT_FIELDS, hourly_feature_matrix, engineer_hourly_features),
+])
+@pytest.mark.parametrize('bad', [{'season': '4.0'}, {'mnth': 'x'}, {'temp': 'warm'}])
+def test_columnar_rejects_what_scalar_rejects(fields, build_matrix, engineer, bad):
+    record = dict(random_record(random.Random(1)), **bad)
+
+    with pytest.raises(ValueError):
+        engineer(record)
+    with pytest.raises(ValueError):
+        build_matrix(records_to_columns([record], fields))
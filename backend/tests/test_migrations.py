@@ -0,0 +1,81 @@
+import re
+
+import pytest
+
+from utils import migrations
+from utils.database import connect
+from utils.migrations import HOT_QUERIES, MIGRATIONS, check_query_plans, migrate
+
+# Full-table scan ("SCAN predictions", not "SCAN predictions USING ... INDEX")
+TABLE_SCAN = re.compile(r'^SCAN \w+( AS \w+)?$')
+
+
+def query_plan(conn, name):
+    sql, params = HOT_QUERIES[name]
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+
+def assert_indexed(conn, name):
+    plan = query_plan(conn, name)
+    assert not [d for d in plan if TABLE_SCAN.match(d)], f"{name} scans a table: {plan}"
+    assert not [d for d in plan if 'USE TEMP B-TREE' in d], f"{name} sorts in a temp B-tree: {plan}"
+
+
+def index_names(conn):
+    return {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+
+
+@pytest.fixture
+def fresh_path(tmp_path):
+    path = str(tmp_path / 'ridewise.db')
+    migrate(path)
+    return path
+
+
+@pytest.fixture
+def fresh_db(fresh_path):
+    conn = connect(fresh_path)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(fresh_db, name):
+    assert_indexed(fresh_db, name)
+
+
+def test_upgraded_schema_matches_fresh_schema(tmp_path, monkeypatch, fresh_db):
+    # A database created before the indexes dropped by migrations 7 and 8
+    path = str(tmp_path / 'upgraded.db')
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS[:6])
+    migrate(path)
+    conn = connect(path)
+    conn.execute("INSERT INTO users (username, email, password) VALUES ('alice', 'a@x', 'x')")
+    conn.executemany(
+        "INSERT INTO predictions (user_id, prediction_type, input_data, prediction_value) "
+        "VALUES (1, ?, '{}', ?)", [('daily' if i % 2 else 'hourly', i) for i in range(50)])
+    conn.commit()
+    assert {'idx_predictions_user_created', 'idx_predictions_user_type'} <= index_names(conn)
+    conn.close()
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    assert [version for version, _ in migrate(path)] == [7, 8]
+
+    conn = connect(path)
+    assert index_names(conn) == index_names(fresh_db)
+    for name in HOT_QUERIES:
+        assert_indexed(conn, name)
+    conn.close()
+
+
+def test_check_query_plans_flags_a_missing_index(fresh_path, fresh_db):
+    assert not any(problems for _, problems in check_query_plans(fresh_db).values())
+
+    fresh_db.execute('DROP INDEX idx_predictions_user_recent')
+    # New connection: cached EXPLAIN statements keep the plan they were prepared with
+    conn = connect(fresh_path)
+    assert check_query_plans(conn)['prediction_history'][1]
+    with pytest.raises(AssertionError):
+        assert_indexed(conn, 'prediction_history')
+    conn.close()
@@ -1,70 +1,211 @@
-# backend/utils/database.py
+import ast
+import atexit
+import json
+import logging
+import queue
 import sqlite3
 import os
+import threading
 
-def get_db():
-    """Get database connection"""
-    db_path = 'data/ridewise.db'
-    os.makedirs('data', exist_ok=True)
+from flask import g, has_app_context
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Idle connections per database path, reused across requests and threads
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+_POOL_PID = os.getpid()
+
+
+class PooledConnection:
+    """
+    A pooled sqlite3 connection. Behaves like the connection it wraps,
+    except close() hands it back for reuse (rolling back anything left
+    uncommitted) instead of closing it.
+    """
+
+    def __init__(self, conn, path, scoped=False):
+        self._conn = conn
+        self._path = path
+        self._scoped = scoped
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
 
-    conn = sqlite3.connect(db_path)
+    def close(self):
+        if self._conn is None:
+            return
+        if self._conn.in_transaction:
+            self._conn.rollback()
+        # The app context's connection stays checked out until teardown
+        if not self._scoped:
+            _release(self._path, self._conn)
+            self._conn = None
+
+    def release(self):
+        """Return the connection to the pool regardless of scope"""
+        self._scoped = False
+        self.close()
+
+
+def connect(path):
+    """Open a new, unpooled connection with WAL and the tuned pragmas"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {int(Config.DB_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA cache_size = -{int(Config.DB_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+    conn.execute('PRAGMA temp_store = MEMORY')
     return conn
 
+
+def _pool(path):
+    global _POOL_PID
+    with _POOLS_LOCK:
+        # Connections must not cross a fork (e.g. gunicorn --preload)
+        if os.getpid() != _POOL_PID:
+            _POOLS.clear()
+            _POOL_PID = os.getpid()
+        pool = _POOLS.get(path)
+        if pool is None:
+            pool = _POOLS[path] = queue.LifoQueue(maxsize=max(0, Config.DB_POOL_SIZE) or 1)
+        return pool
+
+
+def _acquire(path):
+    try:
+        return _pool(path).get_nowait()
+    except queue.Empty:
+        return connect(path)
+
+
+def _release(path, conn):
+    try:
+        _pool(path).put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def get_db():
+    """
+    Get a database connection. Inside a request (app context) every call
+    returns the same connection, released on teardown; elsewhere each
+    call borrows one from the pool until close().
+    """
+    path = Config.DATABASE_PATH
+    if has_app_context():
+        conn = g.get('_db')
+        if conn is None or conn._conn is None:
+            conn = g._db = PooledConnection(_acquire(path), path, scoped=True)
+        return conn
+    return PooledConnection(_acquire(path), path)
+
+
+def close_db(exception=None):
+    """Release the app context's connection back to the pool"""
+    conn = g.pop('_db', None)
+    if conn is not None:
+        conn.release()
+
+
+def close_pool():
+    """Close every idle pooled connection"""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def init_app(app):
+    """Release request connections on teardown; close the pool at exit"""
+    app.teardown_appcontext(close_db)
+    atexit.register(close_pool)
+
+# Model inputs stored as typed predictions columns: (column, input field, type)
+PREDICTION_FEATURE_COLUMNS = (
+    ('input_date', 'date', str),
+    ('season', 'season', int),
+    ('yr', 'yr', int),
+    ('mnth', 'mnth', int),
+    ('weekday', 'weekday', int),
+    ('holiday', 'holiday', int),
+    ('workingday', 'workingday', int),
+    ('weathersit', 'weathersit', int),
+    ('temp', 'temp', float),
+    ('atemp', 'atemp', float),
+    ('hum', 'hum', float),
+    ('windspeed', 'windspeed', float),
+    ('hr', 'hr', int),
+)
+
+
+def prediction_feature_values(data):
+    """Typed column values for a prediction's inputs (None where missing or invalid)"""
+    values = []
+    for _, field, kind in PREDICTION_FEATURE_COLUMNS:
+        value = data.get(field)
+        try:
+            if value is None or value == '':
+                value = None
+            elif kind is int:
+                value = int(float(value))
+            elif kind is float:
+                value = float(value)
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            value = None
+        values.append(value)
+    return values
+
+
+def parse_input_data(text):
+    """The dict stored in predictions.input_data (str(dict) or JSON), or None"""
+    # Fast path: with no double quotes or backslashes in a repr, every
+    # single quote delimits a string, so swapping them yields JSON
+    if isinstance(text, str) and '"' not in text and '\\' not in text:
+        try:
+            data = json.loads(text.replace("'", '"'))
+            return data if isinstance(data, dict) else None
+        except ValueError:
+            pass  # e.g. True/None; fall through
+
+    try:
+        data = ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return None
+    return data if isinstance(data, dict) else None
+
+
 def init_db():
-    """Initialize database with all tables"""
-    conn = get_db()
-    cursor = conn.cursor()
-
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # Chat history table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS chat_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            message TEXT NOT NULL,
-            response TEXT NOT NULL,
-            source TEXT DEFAULT 'text',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-
-    # Predictions table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS predictions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            prediction_type TEXT NOT NULL,
-            input_data TEXT NOT NULL,
-            prediction_value REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-
-    # Feedback table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feedback (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            rating INTEGER NOT NULL,
-            comment TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized successfully")
\ No newline at end of file
+    """Bring the database schema up to date"""
+    from utils.migrations import migrate
+
+    applied = migrate()
+    logger.info("Database initialized successfully (%d migrations applied)", len(applied))
@@ -0,0 +1,45 @@
+import numpy as np
+
+# Meteorological season per month (index 0 unused): 1=winter, 2=spring, 3=summer, 4=fall
+SEASON_BY_MONTH = np.array([0, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 1])
+
+
+def derive_date_features(date_obj):
+    """
+    Calendar features the models expect, derived from a date.
+    weekday follows the dataset convention (0 = Sunday).
+    """
+    month = date_obj.month
+    return {
+        "mnth": month,
+        "weekday": (date_obj.weekday() + 1) % 7,
+        "season": int(SEASON_BY_MONTH[month]),
+        "yr": 1 if date_obj.year >= 2012 else 0,
+    }
+
+
+def date_range(start_date, end_date):
+    """Inclusive range of dates as a datetime64[D] array"""
+    start = np.datetime64(start_date, 'D')
+    end = np.datetime64(end_date, 'D')
+    return np.arange(start, end + 1, dtype='datetime64[D]')
+
+
+def derive_date_columns(dates):
+    """
+    Vectorized derive_date_features for a datetime64[D] array.
+    Also returns 'day' (day of month) for the day_sin feature.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    months = dates.astype('datetime64[M]')
+    month = months.astype(np.int64) % 12 + 1
+    year = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+    return {
+        "mnth": month,
+        # 1970-01-01 was a Thursday (weekday 4 with Sunday = 0)
+        "weekday": (dates.astype(np.int64) + 4) % 7,
+        "season": SEASON_BY_MONTH[month],
+        "yr": (year >= 2012).astype(np.int64),
+        "day": (dates - months).astype(np.int64) + 1,
+    }
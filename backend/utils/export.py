@@ -0,0 +1,84 @@
+"""
+Streaming CSV/NDJSON export of a user's rows.
+
+Rows are read from one cursor EXPORT_BATCH_SIZE at a time with fetchmany
+and each batch is encoded and yielded before the next is read, so memory
+stays flat however much history a user has. gzip compresses the stream
+incrementally.
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+
+from flask import Response, stream_with_context
+
+from config import Config
+from utils.database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Streamed response types of the exports and /predictions/bulk
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def csv_chunk(rows):
+    """CSV text for rows (a header is just the first row), with '\n' line endings"""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
+
+
+def export_chunks(conn, sql, params, columns, output_format):
+    """Encoded text chunks for the rows of `sql`: the CSV header (if any), then one per batch"""
+    cursor = conn.execute(sql, params)
+    batch_size = max(1, Config.EXPORT_BATCH_SIZE)
+
+    if output_format == 'csv':
+        yield csv_chunk([columns])
+
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if output_format == 'ndjson':
+            yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows)
+        else:
+            yield csv_chunk(rows)
+    cursor.close()
+
+
+def gzip_chunks(chunks, level=6):
+    """gzip-compress a stream of text chunks without buffering it"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(sql, params, columns, output_format, compress=False, filename='export'):
+    """
+    Chunked response streaming the rows of `sql`. A failure after the
+    headers are sent aborts the stream, so a truncated export never looks
+    complete.
+    """
+    def generate():
+        conn = get_db()
+        try:
+            yield from export_chunks(conn, sql, params, columns, output_format)
+        except Exception as e:
+            logger.exception("Export of %s failed mid-stream: %s", filename, e)
+            raise
+        finally:
+            conn.close()
+
+    chunks = stream_with_context(generate())
+    response = Response(gzip_chunks(chunks) if compress else chunks,
+                        mimetype=EXPORT_FORMATS[output_format])
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{output_format}"'
+    return response
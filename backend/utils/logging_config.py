@@ -0,0 +1,200 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+from config import Config
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id'}
+
+_LISTENER = None
+_CONFIG_LOCK = threading.Lock()
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+def current_request_id():
+    """Request id of the Flask request being handled on this thread, or None"""
+    if not has_request_context():
+        return None
+    return g.get('request_id')
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current request id (runs in the caller's thread)"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = current_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of high-frequency debug records.
+
+    Records below INFO pass with probability `rate`; a call can override it
+    with extra={'sample_rate': 0.01}. INFO and above are never sampled.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        rate = getattr(record, 'sample_rate', None)
+        if rate is None:
+            if record.levelno >= logging.INFO:
+                return True
+            rate = self.rate
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id, extras"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, 'request_id', None),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key != 'sample_rate':
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        elif record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = None
+        return super().format(record)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the request thread: when the queue is
+    full the record is dropped and counted instead of waiting for the
+    writer thread.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Render the message and traceback here, while args are still live,
+        # and leave the JSON encoding to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_levels(spec):
+    """'models.ml_model=WARNING,services=DEBUG' -> {'models.ml_model': 'WARNING', ...}"""
+    levels = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging():
+    """
+    Route all logging through a bounded queue to one writer thread.
+
+    Safe to call more than once; only the first call installs handlers.
+    Levels come from Config.LOG_LEVEL and the per-logger Config.LOG_LEVELS.
+    """
+    global _LISTENER
+    with _CONFIG_LOCK:
+        if _LISTENER is not None:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter() if Config.LOG_FORMAT == 'json' else TextFormatter())
+
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(Config.LOG_DEBUG_SAMPLE_RATE))
+        queue_handler.addFilter(RequestIdFilter())
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(Config.LOG_LEVEL.upper())
+
+        for name, level in _parse_levels(Config.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _LISTENER = logging.handlers.QueueListener(log_queue, stream_handler,
+                                                   respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _LISTENER
+    with _CONFIG_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            _LISTENER = None
+
+
+def dropped_records():
+    """Records dropped because the log queue was full"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            return handler.dropped
+    return 0
+
+
+def init_request_logging(app):
+    """Give every request an id (X-Request-ID if the client sent one) and echo it back"""
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or new_request_id()
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
@@ -0,0 +1,180 @@
+import bisect
+import threading
+import time
+
+from config import Config
+
+# Upper bounds (seconds) for stage and request latency histograms
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Pipeline stages timed on the prediction path
+STAGES = ('jwt_decode', 'validation', 'feature_engineering', 'model_predict',
+          'lookup_table', 'db_write', 'json_serialize')
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, safe to observe from any thread"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class HistogramFamily:
+    """Histograms of one metric keyed by a single label value"""
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value):
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, Histogram(self.buckets))
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, child in sorted(self._children.items()):
+            counts, total, count = child.snapshot()
+            label = f'{self.label}="{_escape(value)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(child.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label}}} {total}')
+            lines.append(f'{self.name}_count{{{label}}} {count}')
+        return lines
+
+
+STAGE_DURATION = HistogramFamily(
+    'ridewise_stage_duration_seconds',
+    'Time spent in each stage of the prediction path',
+    'stage', STAGE_BUCKETS
+)
+REQUEST_DURATION = HistogramFamily(
+    'ridewise_request_duration_seconds',
+    'End-to-end request latency per endpoint',
+    'endpoint', REQUEST_BUCKETS
+)
+
+# Pre-create the stage series so they are exported before the first request
+for _stage in STAGES:
+    STAGE_DURATION.labels(_stage)
+
+
+class timed:
+    """
+    Context manager that records the duration of a block under a stage:
+
+        with timed('model_predict'):
+            raw = model.predict(matrix)
+
+    A no-op when METRICS_ENABLED is off.
+    """
+
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, stage):
+        self.histogram = STAGE_DURATION.labels(stage) if Config.METRICS_ENABLED else None
+
+    def __enter__(self):
+        if self.histogram is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.histogram is not None:
+            self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+def observe_request(endpoint, seconds):
+    """Record the latency of one request"""
+    if Config.METRICS_ENABLED:
+        REQUEST_DURATION.labels(endpoint or 'unknown').observe(seconds)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric(lines, name, metric_type, help_text, samples):
+    """Append one counter/gauge with its (labels, value) samples"""
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for labels, value in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+        else:
+            lines.append(f"{name} {value}")
+
+
+def render_metrics(cache_stats=None, batcher_stats=None, log_dropped=None, writer_stats=None):
+    """All metrics in the Prometheus text exposition format"""
+    lines = STAGE_DURATION.render() + REQUEST_DURATION.render()
+
+    if cache_stats is not None:
+        for key, metric_type, help_text in (
+                ('hits', 'counter', 'Prediction cache hits'),
+                ('misses', 'counter', 'Prediction cache misses'),
+                ('evictions', 'counter', 'Prediction cache LRU evictions'),
+                ('expirations', 'counter', 'Prediction cache TTL expirations'),
+                ('size', 'gauge', 'Entries in the prediction cache'),
+                ('memory_bytes', 'gauge', 'Approximate prediction cache memory use')):
+            suffix = '_total' if metric_type == 'counter' else ''
+            _metric(lines, f'ridewise_prediction_cache_{key}{suffix}', metric_type, help_text,
+                    [({}, cache_stats[key])])
+
+    if batcher_stats is not None:
+        batchers = batcher_stats['batchers']
+        for key, metric_type, help_text in (
+                ('batches', 'counter', 'Model calls made by the micro-batcher'),
+                ('items', 'counter', 'Predictions served by the micro-batcher'),
+                ('queued', 'gauge', 'Predictions waiting in the micro-batcher queue')):
+            suffix = '_total' if metric_type == 'counter' else ''
+            _metric(lines, f'ridewise_micro_batcher_{key}{suffix}', metric_type, help_text,
+                    [({'model': model_type}, stats[key]) for model_type, stats in sorted(batchers.items())])
+
+    if writer_stats is not None:
+        for key, metric_type, help_text in (
+                ('written', 'counter', 'Predictions inserted by the write-behind writer'),
+                ('batches', 'counter', 'Insert transactions made by the write-behind writer'),
+                ('dropped', 'counter', 'Predictions dropped because the write queue was full'),
+                ('spilled', 'counter', 'Predictions spilled to file because the write queue was full'),
+                ('failed', 'counter', 'Predictions that could not be written'),
+                ('corrupt', 'counter', 'Spilled lines skipped on replay because they did not parse'),
+                ('queued', 'gauge', 'Predictions waiting in the write queue')):
+            suffix = '_total' if metric_type == 'counter' else ''
+            _metric(lines, f'ridewise_prediction_writer_{key}{suffix}', metric_type, help_text,
+                    [({}, writer_stats[key])])
+
+    if log_dropped is not None:
+        _metric(lines, 'ridewise_log_records_dropped_total', 'counter',
+                'Log records dropped because the log queue was full', [({}, log_dropped)])
+
+    return '\n'.join(lines) + '\n'
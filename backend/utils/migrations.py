@@ -0,0 +1,400 @@
+"""
+Versioned schema migrations.
+
+Each migration is (version, name, steps); a step is an SQL statement or a
+callable taking the connection. Applied versions are recorded in
+`schema_migrations`, and each migration runs in its own BEGIN IMMEDIATE
+transaction, so several workers starting at once apply it exactly once.
+
+Data backfills are @batched steps: they run before the migration's
+transaction, one short transaction per batch, so writers aren't locked
+out for the whole backfill and an interrupted run picks up where it
+stopped. A batched step must be idempotent.
+
+Migrations run at app startup (init_db); from the command line:
+
+    python -m utils.migrations              # apply pending migrations
+    python -m utils.migrations --status     # list applied/pending versions
+    python -m utils.migrations --check      # EXPLAIN QUERY PLAN the hot queries
+
+--check exits non-zero if a hot query scans a whole table or sorts in a
+temporary B-tree instead of using an index.
+"""
+import argparse
+import logging
+import sys
+
+from config import Config
+from utils.database import (
+    connect, parse_input_data, prediction_feature_values, PREDICTION_FEATURE_COLUMNS
+)
+from utils import user_stats
+
+logger = logging.getLogger(__name__)
+
+# Rows per transaction in backfills
+BACKFILL_BATCH_SIZE = 5000
+
+
+def batched(step):
+    """
+    Mark step(conn, after_id) as a batched backfill: it processes the next
+    batch of rows after after_id and returns the last id it saw, or None
+    when there is nothing left.
+    """
+    step.batched = True
+    return step
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _rename_legacy_prediction_columns(conn):
+    """Older databases named the predictions columns type/prediction"""
+    columns = _columns(conn, 'predictions')
+    if 'type' in columns and 'prediction_type' not in columns:
+        conn.execute('ALTER TABLE predictions RENAME COLUMN type TO prediction_type')
+    if 'prediction' in columns and 'prediction_value' not in columns:
+        conn.execute('ALTER TABLE predictions RENAME COLUMN prediction TO prediction_value')
+
+
+def _add_prediction_feature_columns(conn):
+    columns = _columns(conn, 'predictions')
+    for column, _, kind in PREDICTION_FEATURE_COLUMNS:
+        if column not in columns:
+            sql_type = {int: 'INTEGER', float: 'REAL', str: 'TEXT'}[kind]
+            conn.execute(f'ALTER TABLE predictions ADD COLUMN {column} {sql_type}')
+
+
+@batched
+def _backfill_prediction_features(conn, after_id):
+    """Parse input_data of rows saved before the typed columns existed"""
+    rows = conn.execute('''
+        SELECT id, input_data, season FROM predictions
+        WHERE id > ? ORDER BY id LIMIT ?
+    ''', (after_id, BACKFILL_BATCH_SIZE)).fetchall()
+    if not rows:
+        return None
+
+    updates = []
+    for row_id, input_data, season in rows:
+        if season is not None:
+            continue
+        data = parse_input_data(input_data)
+        if data:
+            updates.append((*prediction_feature_values(data), row_id))
+
+    if updates:
+        assignments = ', '.join(f'{column} = ?' for column, _, _ in PREDICTION_FEATURE_COLUMNS)
+        conn.executemany(f'UPDATE predictions SET {assignments} WHERE id = ?', updates)
+    return rows[-1][0]
+
+
+MIGRATIONS = [
+    (1, 'create_tables', (
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            response TEXT NOT NULL,
+            source TEXT DEFAULT 'text',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            prediction_type TEXT NOT NULL,
+            input_data TEXT NOT NULL,
+            prediction_value REAL NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            rating INTEGER NOT NULL,
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+    )),
+    (2, 'rename_legacy_prediction_columns', (
+        _rename_legacy_prediction_columns,
+    )),
+    (3, 'create_jobs', (
+        '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            params TEXT NOT NULL,
+            progress REAL DEFAULT 0,
+            result TEXT,
+            result_path TEXT,
+            error TEXT,
+            attempts INTEGER DEFAULT 0,
+            cancel_requested INTEGER DEFAULT 0,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL,
+            expires_at REAL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs (expires_at)',
+    )),
+    (4, 'index_hot_queries', (
+        # History and "last prediction": newest first per user. Covers the
+        # selected columns so the table itself is never read (id is the rowid)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_predictions_user_created
+        ON predictions (user_id, created_at, prediction_type, prediction_value)
+        ''',
+        # Per-type counts on the dashboard
+        'CREATE INDEX IF NOT EXISTS idx_predictions_user_type ON predictions (user_id, prediction_type)',
+        'CREATE INDEX IF NOT EXISTS idx_chat_history_user_created ON chat_history (user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback (user_id)',
+    )),
+    (5, 'add_prediction_feature_columns', (
+        _add_prediction_feature_columns,
+    )),
+    (6, 'backfill_prediction_features', (
+        _backfill_prediction_features,
+    )),
+    # After the backfill, so it doesn't have to maintain these indexes
+    (7, 'index_prediction_features', (
+        # Analytics GROUP BYs, read in index order and covered (no table reads).
+        # The (user_id, prediction_type) prefix also serves the per-type counts
+        '''
+        CREATE INDEX IF NOT EXISTS idx_predictions_user_weather
+        ON predictions (user_id, weathersit, prediction_value)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_predictions_user_type_hr
+        ON predictions (user_id, prediction_type, hr, prediction_value)
+        ''',
+        'DROP INDEX IF EXISTS idx_predictions_user_type',
+    )),
+    (8, 'create_user_stats', (
+        # Newest-first per user with id as the tie-breaker, for the latest
+        # prediction and keyset pages; replaces idx_predictions_user_created
+        '''
+        CREATE INDEX IF NOT EXISTS idx_predictions_user_recent
+        ON predictions (user_id, created_at, id, prediction_type, prediction_value)
+        ''',
+        'DROP INDEX IF EXISTS idx_predictions_user_created',
+        user_stats.CREATE_TABLE,
+        *user_stats.TRIGGERS,
+        user_stats.rebuild_user_stats,
+    )),
+]
+
+# Queries on the request path that must be served from an index:
+# name -> (sql, sample parameters)
+HOT_QUERIES = {
+    'prediction_history': ('''
+        SELECT id, prediction_type, prediction_value, created_at
+        FROM predictions WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 21
+    ''', (1,)),
+    'prediction_history_ties': ('''
+        SELECT id, prediction_type, prediction_value, created_at
+        FROM predictions WHERE user_id = ? AND created_at = ? AND id < ?
+        ORDER BY id DESC LIMIT 21
+    ''', (1, '2100-01-01 00:00:00', 0)),
+    'prediction_history_page': ('''
+        SELECT id, prediction_type, prediction_value, created_at
+        FROM predictions WHERE user_id = ? AND created_at < ?
+        ORDER BY created_at DESC, id DESC LIMIT 21
+    ''', (1, '2100-01-01 00:00:00')),
+    'prediction_export': ('''
+        SELECT id, prediction_type, prediction_value, created_at, weathersit, hr
+        FROM predictions WHERE user_id = ? ORDER BY created_at, id
+    ''', (1,)),
+    'last_prediction': ('''
+        SELECT id, prediction_value, prediction_type, created_at
+        FROM predictions WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 1
+    ''', (1,)),
+    'dashboard_stats': ('''
+        SELECT u.id, s.* FROM users u LEFT JOIN user_stats s ON s.user_id = u.id
+        WHERE u.username = ?
+    ''', ('alice',)),
+    'prediction_count': ('SELECT COUNT(*) FROM predictions WHERE user_id = ?', (1,)),
+    'prediction_count_by_type': (
+        'SELECT COUNT(*) FROM predictions WHERE user_id = ? AND prediction_type = ?', (1, 'daily')),
+    'chat_history': ('''
+        SELECT id, message, response, source, created_at
+        FROM chat_history WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 21
+    ''', (1,)),
+    'chat_history_ties': ('''
+        SELECT id, message, response, source, created_at
+        FROM chat_history WHERE user_id = ? AND created_at = ? AND id < ?
+        ORDER BY id DESC LIMIT 21
+    ''', (1, '2100-01-01 00:00:00', 0)),
+    'chat_history_page': ('''
+        SELECT id, message, response, source, created_at
+        FROM chat_history WHERE user_id = ? AND created_at < ?
+        ORDER BY created_at DESC, id DESC LIMIT 21
+    ''', (1, '2100-01-01 00:00:00')),
+    'chat_export': ('''
+        SELECT id, message, response, source, created_at
+        FROM chat_history WHERE user_id = ? ORDER BY created_at, id
+    ''', (1,)),
+    'weather_impact': ('''
+        SELECT weathersit, AVG(prediction_value), COUNT(*)
+        FROM predictions WHERE user_id = ? AND weathersit BETWEEN 1 AND 4
+        GROUP BY weathersit ORDER BY weathersit
+    ''', (1,)),
+    'hourly_patterns': ('''
+        SELECT hr, AVG(prediction_value), COUNT(*)
+        FROM predictions WHERE user_id = ? AND prediction_type = 'hourly' AND hr BETWEEN 0 AND 23
+        GROUP BY hr ORDER BY hr
+    ''', (1,)),
+    'feedback_count': ('SELECT COUNT(*) FROM feedback WHERE user_id = ?', (1,)),
+    'queued_jobs': ('SELECT id, kind FROM jobs WHERE status = ? ORDER BY created_at LIMIT ?',
+                    ('queued', 2)),
+}
+
+
+def _ensure_migrations_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(conn):
+    _ensure_migrations_table(conn)
+    return {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+
+
+def _run_batched(conn, version, name, step):
+    """Run a batched step to completion, one transaction per batch"""
+    after_id, batches = 0, 0
+    while after_id is not None:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            next_id = step(conn, after_id)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            logger.exception("Migration %d_%s failed after id %d", version, name, after_id)
+            raise
+        batches += 1
+        if next_id is not None and batches % 100 == 0:
+            logger.info("Migration %d_%s: through id %d", version, name, next_id)
+        after_id = next_id
+
+
+def migrate(path=None):
+    """Apply pending migrations in order; returns the (version, name) pairs applied"""
+    conn = connect(path or Config.DATABASE_PATH)
+    conn.isolation_level = None  # explicit transactions below
+    applied = []
+    try:
+        done = applied_versions(conn)
+        for version, name, steps in MIGRATIONS:
+            if version in done:
+                continue
+
+            for step in steps:
+                if getattr(step, 'batched', False):
+                    _run_batched(conn, version, name, step)
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Another worker may have applied it while we waited for the lock
+                if conn.execute('SELECT 1 FROM schema_migrations WHERE version = ?',
+                                (version,)).fetchone():
+                    conn.execute('ROLLBACK')
+                    continue
+                for step in steps:
+                    if getattr(step, 'batched', False):
+                        continue
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                             (version, name))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                logger.exception("Migration %d_%s failed", version, name)
+                raise
+
+            applied.append((version, name))
+            logger.info("Applied migration %d_%s", version, name)
+    finally:
+        conn.close()
+    return applied
+
+
+def check_query_plans(conn):
+    """
+    EXPLAIN QUERY PLAN every hot query. Returns {name: (plan, problems)},
+    where problems lists full-table scans and temp B-tree sorts.
+    """
+    report = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        problems = [detail for detail in plan
+                    if (detail.startswith('SCAN ') and ' USING ' not in detail)
+                    or 'TEMP B-TREE' in detail]
+        report[name] = (plan, problems)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--check', action='store_true', help="check the hot queries' plans use indexes")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        conn = connect(Config.DATABASE_PATH)
+        done = applied_versions(conn)
+        conn.close()
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>4} {name:<40} {'applied' if version in done else 'pending'}")
+        return 0
+
+    applied = migrate()
+    print(f"Applied {len(applied)} migration(s)" + ''.join(f"\n  {v}_{n}" for v, n in applied))
+
+    if args.check:
+        conn = connect(Config.DATABASE_PATH)
+        report = check_query_plans(conn)
+        conn.close()
+        failed = 0
+        for name, (plan, problems) in report.items():
+            print(f"{'FAIL' if problems else 'ok  '} {name}: {'; '.join(plan)}")
+            failed += bool(problems)
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
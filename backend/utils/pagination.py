@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination for per-user history lists.
+
+Pages are ordered newest first by (created_at, id) and continue from the
+last row of the previous page, so with an index on (user_id, created_at[,
+id]) every page costs O(page size) however deep it is. The position is
+handed to clients as an opaque cursor token.
+"""
+import base64
+import json
+
+from config import Config
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque token for the position after the row (created_at, row_id)"""
+    raw = json.dumps([created_at, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(token):
+    """(created_at, id) from a cursor token; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def page_size(value, default=None):
+    """Requested page size clamped to 1..Config.MAX_PAGE_SIZE; ValueError if not a number"""
+    if value is None or value == '':
+        return default or Config.DEFAULT_PAGE_SIZE
+    return max(1, min(int(value), Config.MAX_PAGE_SIZE))
+
+
+def fetch_page(conn, table, columns, user_id, limit, cursor=None):
+    """
+    One page of `table` rows for user_id, newest first.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Reads at most limit + 1 rows with fetchmany, so no more than that is
+    ever held in memory.
+    """
+    select = f'SELECT {", ".join(columns)}, id AS _page_id, created_at AS _page_created_at FROM {table}'
+    wanted = limit + 1
+
+    if cursor is None:
+        rows = conn.execute(f'''
+            {select} WHERE user_id = ?
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        ''', (user_id, wanted)).fetchmany(wanted)
+    else:
+        # (created_at, id) < (?, ?) as two index seeks: SQLite only seeks
+        # the row value on created_at, so rows sharing the cursor's
+        # timestamp (e.g. one saved batch) would be rescanned on every page
+        created_at, row_id = decode_cursor(cursor)
+        rows = conn.execute(f'''
+            {select} WHERE user_id = ? AND created_at = ? AND id < ?
+            ORDER BY id DESC LIMIT ?
+        ''', (user_id, created_at, row_id, wanted)).fetchmany(wanted)
+        if len(rows) < wanted:
+            rows += conn.execute(f'''
+                {select} WHERE user_id = ? AND created_at < ?
+                ORDER BY created_at DESC, id DESC LIMIT ?
+            ''', (user_id, created_at, wanted - len(rows))).fetchmany(wanted - len(rows))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['_page_created_at'], last['_page_id'])
+    return rows, next_cursor
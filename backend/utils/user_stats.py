@@ -0,0 +1,195 @@
+"""
+Per-user dashboard aggregates.
+
+`user_stats` holds each user's prediction counts, latest prediction and
+feedback count. Triggers on predictions and feedback keep it current, so
+the dashboard reads one row instead of aggregating the user's history.
+Inserts adjust the counters in O(1); deletes also re-read the latest
+prediction if it was the one removed; updates recompute the affected
+users from the (indexed) base tables.
+
+Consistency checks and repairs:
+
+    python -m utils.user_stats --check            # report drifted rows
+    python -m utils.user_stats --rebuild          # recompute every user
+    python -m utils.user_stats --rebuild --user 42
+"""
+import argparse
+import sys
+
+from config import Config
+from utils.database import connect
+
+STATS_COLUMNS = ('user_id', 'total_predictions', 'daily_predictions', 'hourly_predictions',
+                 'last_prediction_id', 'last_prediction_value', 'last_prediction_type',
+                 'last_prediction_at', 'feedback_count')
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        total_predictions INTEGER NOT NULL DEFAULT 0,
+        daily_predictions INTEGER NOT NULL DEFAULT 0,
+        hourly_predictions INTEGER NOT NULL DEFAULT 0,
+        last_prediction_id INTEGER,
+        last_prediction_value REAL,
+        last_prediction_type TEXT,
+        last_prediction_at TIMESTAMP,
+        feedback_count INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+# Newest prediction of user u.id (served by idx_predictions_user_recent)
+_LATEST = '''(SELECT {column} FROM predictions p WHERE p.user_id = u.id
+              ORDER BY p.created_at DESC, p.id DESC LIMIT 1)'''
+
+
+def stats_select(users):
+    """SELECT computing user_stats rows from scratch for the ids produced by `users` (column id)"""
+    return f'''
+        SELECT u.id,
+               (SELECT COUNT(*) FROM predictions p WHERE p.user_id = u.id),
+               (SELECT COUNT(*) FROM predictions p WHERE p.user_id = u.id AND p.prediction_type = 'daily'),
+               (SELECT COUNT(*) FROM predictions p WHERE p.user_id = u.id AND p.prediction_type = 'hourly'),
+               {_LATEST.format(column='id')},
+               {_LATEST.format(column='prediction_value')},
+               {_LATEST.format(column='prediction_type')},
+               {_LATEST.format(column='created_at')},
+               (SELECT COUNT(*) FROM feedback f WHERE f.user_id = u.id)
+        FROM ({users}) u
+    '''
+
+
+_ALL_USERS = '''
+    SELECT user_id AS id FROM predictions
+    UNION SELECT user_id FROM feedback WHERE user_id IS NOT NULL
+'''
+
+
+def _newer(column):
+    """Upsert assignment taking the inserted prediction's value if it is the newest"""
+    return (f"{column} = CASE WHEN last_prediction_at IS NULL "
+            f"OR excluded.last_prediction_at >= last_prediction_at "
+            f"THEN excluded.{column} ELSE {column} END")
+
+
+TRIGGERS = (
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_user_stats_prediction_insert
+    AFTER INSERT ON predictions
+    BEGIN
+        INSERT INTO user_stats (user_id, total_predictions, daily_predictions, hourly_predictions,
+                                last_prediction_id, last_prediction_value, last_prediction_type,
+                                last_prediction_at)
+        VALUES (NEW.user_id, 1, NEW.prediction_type = 'daily', NEW.prediction_type = 'hourly',
+                NEW.id, NEW.prediction_value, NEW.prediction_type, NEW.created_at)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_predictions = total_predictions + 1,
+            daily_predictions = daily_predictions + excluded.daily_predictions,
+            hourly_predictions = hourly_predictions + excluded.hourly_predictions,
+            {_newer('last_prediction_id')},
+            {_newer('last_prediction_value')},
+            {_newer('last_prediction_type')},
+            {_newer('last_prediction_at')};
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_user_stats_prediction_delete
+    AFTER DELETE ON predictions
+    BEGIN
+        UPDATE user_stats SET
+            total_predictions = total_predictions - 1,
+            daily_predictions = daily_predictions - (OLD.prediction_type = 'daily'),
+            hourly_predictions = hourly_predictions - (OLD.prediction_type = 'hourly')
+        WHERE user_id = OLD.user_id;
+
+        UPDATE user_stats SET
+            (last_prediction_id, last_prediction_value, last_prediction_type, last_prediction_at) =
+            (SELECT id, prediction_value, prediction_type, created_at FROM predictions
+             WHERE user_id = OLD.user_id ORDER BY created_at DESC, id DESC LIMIT 1)
+        WHERE user_id = OLD.user_id AND last_prediction_id = OLD.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_user_stats_prediction_update
+    AFTER UPDATE OF user_id, prediction_type, prediction_value, created_at ON predictions
+    BEGIN
+        INSERT OR REPLACE INTO user_stats ({', '.join(STATS_COLUMNS)})
+        {stats_select('SELECT OLD.user_id AS id UNION SELECT NEW.user_id')};
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_user_stats_feedback_insert
+    AFTER INSERT ON feedback WHEN NEW.user_id IS NOT NULL
+    BEGIN
+        INSERT INTO user_stats (user_id, feedback_count) VALUES (NEW.user_id, 1)
+        ON CONFLICT (user_id) DO UPDATE SET feedback_count = feedback_count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_user_stats_feedback_delete
+    AFTER DELETE ON feedback WHEN OLD.user_id IS NOT NULL
+    BEGIN
+        UPDATE user_stats SET feedback_count = feedback_count - 1 WHERE user_id = OLD.user_id;
+    END
+    ''',
+)
+
+
+def rebuild_user_stats(conn, user_id=None):
+    """Recompute user_stats from the base tables (one user, or everyone)"""
+    if user_id is None:
+        conn.execute('DELETE FROM user_stats')
+        users = _ALL_USERS
+        params = ()
+    else:
+        conn.execute('DELETE FROM user_stats WHERE user_id = ?', (user_id,))
+        users = 'SELECT ? AS id'
+        params = (user_id,)
+    conn.execute(f"INSERT INTO user_stats ({', '.join(STATS_COLUMNS)}) {stats_select(users)}", params)
+
+
+def check_user_stats(conn):
+    """Rows of user_stats that differ from a fresh computation: [(user_id, stored, expected)]"""
+    expected = {row[0]: tuple(row) for row in conn.execute(stats_select(_ALL_USERS))}
+    stored = {row[0]: tuple(row) for row in
+              conn.execute(f"SELECT {', '.join(STATS_COLUMNS)} FROM user_stats")}
+
+    drifted = []
+    for user_id in sorted(set(expected) | set(stored)):
+        want = expected.get(user_id)
+        have = stored.get(user_id)
+        # A user whose rows were all deleted keeps a zeroed row
+        if want is None and have is not None and not any(have[1:4]) and not have[8]:
+            continue
+        if have != want:
+            drifted.append((user_id, have, want))
+    return drifted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the user_stats aggregates")
+    parser.add_argument('--check', action='store_true', help="report users whose stats have drifted")
+    parser.add_argument('--rebuild', action='store_true', help="recompute the stats")
+    parser.add_argument('--user', type=int, help="only this user (with --rebuild)")
+    args = parser.parse_args(argv)
+
+    conn = connect(Config.DATABASE_PATH)
+    try:
+        if args.rebuild:
+            with conn:
+                rebuild_user_stats(conn, args.user)
+            print(f"Rebuilt stats for {'user ' + str(args.user) if args.user else 'all users'}")
+
+        if args.check or not args.rebuild:
+            drifted = check_user_stats(conn)
+            for user_id, have, want in drifted:
+                print(f"user {user_id}: stored {have} expected {want}")
+            print(f"{len(drifted)} user(s) drifted")
+            return 1 if drifted else 0
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import glob
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from utils.database import get_db
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('block', 'drop', 'spill')
+
+# Marks the end of the queue for the writer thread
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Buffers rows for one INSERT statement and writes them from a
+    background thread, so callers never wait on the disk.
+
+    The thread takes the first queued row, keeps collecting until
+    flush_rows rows are queued or flush_ms has passed, then inserts the
+    batch with executemany in one transaction. When the queue is full the
+    overflow policy applies: 'block' waits for room, 'drop' discards the
+    row and counts it, 'spill' appends it to spill_path.<pid> (JSON
+    lines), which is replayed once the queue drains. A batch that fails to
+    insert is spilled too when spill_path is set, else counted as failed.
+    A spill file is claimed for replay by renaming it, so only one process
+    replays it; lines that don't parse (a crash mid-write) are skipped and
+    counted as corrupt. close() writes everything still queued before
+    returning.
+    """
+
+    def __init__(self, sql, flush_rows=500, flush_ms=200.0, max_queue=10000,
+                 overflow='block', spill_path=None, name='write-behind'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of: {', '.join(OVERFLOW_POLICIES)}")
+        if overflow == 'spill' and not spill_path:
+            raise ValueError("overflow='spill' needs a spill_path")
+
+        self.sql = sql
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_ms / 1000
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.name = name
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._closed = False
+        self._claims = itertools.count()
+
+        self.batches = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self.corrupt = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Queue rows (tuples of the statement's parameters) for writing"""
+        if self._closed:
+            self._write(list(rows))
+            return
+
+        for row in rows:
+            if self.overflow == 'block':
+                self._queue.put(row)
+                continue
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                if self.overflow == 'drop':
+                    with self._lock:
+                        self.dropped += 1
+                else:
+                    self._spill([row])
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far has been written"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout=10.0):
+        """Write what is queued and stop the thread"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.error("%s: queue still full at shutdown, %d rows not written",
+                         self.name, self._queue.qsize())
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("%s: %d rows still queued at shutdown", self.name, self._queue.qsize())
+
+    def _collect(self):
+        """Block for the first row, then fill the batch until size or interval is hit"""
+        batch = [self._queue.get()]
+        if batch[0] is _STOP:
+            return [], True
+        deadline = time.perf_counter() + self.flush_interval
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.perf_counter()
+            try:
+                row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _STOP:
+                return batch, True
+            batch.append(row)
+        return batch, False
+
+    def _run(self):
+        if self.spill_path:
+            self._replay_safely(orphans=True)
+
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            try:
+                if batch:
+                    self._write(batch)
+            except Exception as e:
+                # Keep the thread alive: a dead writer would leave the queue to fill up
+                logger.exception("%s: unexpected error writing %d rows: %s", self.name, len(batch), e)
+                with self._lock:
+                    self.failed += len(batch)
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+
+            if self.spill_path and self._queue.empty():
+                self._replay_safely()
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            conn = get_db()
+            try:
+                conn.executemany(self.sql, batch)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.exception("%s: failed to write %d rows: %s", self.name, len(batch), e)
+            if self.spill_path:
+                self._spill(batch)
+            else:
+                with self._lock:
+                    self.failed += len(batch)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.batches += 1
+            self.written += len(batch)
+            self.flush_ms_total += elapsed_ms
+            self.flush_ms_max = max(self.flush_ms_max, elapsed_ms)
+
+    def _own_spill_file(self):
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def _spill(self, rows):
+        with self._spill_lock:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self._own_spill_file(), 'a') as f:
+                for row in rows:
+                    f.write(json.dumps(list(row)) + '\n')
+        with self._lock:
+            self.spilled += len(rows)
+
+    def _replay_safely(self, orphans=False):
+        try:
+            self._replay(orphans)
+        except Exception as e:
+            logger.exception("%s: replaying spilled rows failed: %s", self.name, e)
+
+    def _replay(self, orphans=False):
+        """Write spilled rows: this process's file, and at startup those of dead processes"""
+        paths = [self._own_spill_file()]
+        if orphans:
+            # spill_path.<pid>, and files claimed by a replayer that died
+            # (spill_path.<pid>.replay.<replayer pid>.<n>)
+            paths += [path for path in glob.glob(f"{glob.escape(self.spill_path)}.*")
+                      if path not in paths and not _pid_alive(self._spill_owner(path))]
+
+        for path in paths:
+            # Claim the file atomically under a new name: of concurrent
+            # replayers, one rename wins and the others find it gone
+            writer_pid = path[len(self.spill_path) + 1:].split('.')[0]
+            claimed = f"{self.spill_path}.{writer_pid}.replay.{os.getpid()}.{next(self._claims)}"
+            with self._spill_lock:
+                try:
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue
+
+            replayed = 0
+            batch = []
+            with open(claimed) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        batch.append(tuple(json.loads(line)))
+                    except ValueError:
+                        with self._lock:
+                            self.corrupt += 1
+                        logger.warning("%s: skipped corrupt line in %s", self.name, path)
+                        continue
+                    if len(batch) >= self.flush_rows:
+                        self._write(batch)
+                        replayed += len(batch)
+                        batch = []
+            if batch:
+                self._write(batch)
+                replayed += len(batch)
+            os.remove(claimed)
+            logger.info("%s: replayed %d spilled rows from %s", self.name, replayed, path)
+
+    def _spill_owner(self, path):
+        """Pid of the process responsible for a spill file: the replayer if claimed, else the writer"""
+        parts = path[len(self.spill_path) + 1:].split('.')
+        return parts[2] if len(parts) > 2 and parts[1] == 'replay' else parts[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "overflow": self.overflow,
+                "flush_rows": self.flush_rows,
+                "flush_ms": self.flush_interval * 1000,
+                "queued": self._queue.qsize(),
+                "batches": self.batches,
+                "written": self.written,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "failed": self.failed,
+                "corrupt": self.corrupt,
+                "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+                "flush_ms_avg": round(self.flush_ms_total / self.batches, 3) if self.batches else 0.0,
+                "flush_ms_max": round(self.flush_ms_max, 3),
+            }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except (ValueError, PermissionError, OSError):
+        return True